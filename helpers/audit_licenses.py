@@ -21,6 +21,12 @@ from enrich_sbom import get_maven_license_from_pom
 
 # Logging will be configured in main() based on debug flag
 
+# licenseConcluded values that carry no license information
+MISSING_LICENSE_VALUES = frozenset({'NOASSERTION', 'NONE', 'UNKNOWN'})
+
+# licenseConcluded values that always go through license resolution
+AMBIGUOUS_LICENSE_VALUES = frozenset({'non-standard', 'Weird unknown license'})
+
 
 def load_json_file(file_path, file_type):
     """Loads a JSON file and returns its content."""
@@ -152,6 +158,13 @@ def extract_components(sbom_data):
     """Extracts components from SBOM data."""
     components = sbom_data.get('packages', []) or sbom_data.get('components', [])
     logging.debug(f"Found {len(components)} packages/components in SBOM.")
+    
+    # Many components share a license string; intern it so each distinct value is stored
+    # once and repeated dict lookups on it compare by identity
+    for component in components:
+        license_concluded = component.get('licenseConcluded')
+        if license_concluded:
+            component['licenseConcluded'] = sys.intern(license_concluded)
     return components
 
 
@@ -207,15 +220,38 @@ def find_package_policy(purl, package_policies):
     return None
 
 
+# Most recently built SPDX parser together with the alias dicts it was built from
+_parser_cache = None
+
+
+def get_expression_parser(license_aliases=None, combined_aliases=None, pattern_aliases=None):
+    """
+    Returns an SPDXExpressionParser for the given aliases.
+
+    Building a parser normalizes all alias keys and compiles the pattern aliases,
+    so the parser is reused as long as it is called with the same alias dicts.
+    """
+    global _parser_cache
+
+    if _parser_cache is not None:
+        cached_aliases, cached_combined, cached_patterns, parser = _parser_cache
+        if cached_aliases is license_aliases and cached_combined is combined_aliases and cached_patterns is pattern_aliases:
+            return parser
+
+    parser = SPDXExpressionParser(license_aliases=license_aliases, combined_aliases=combined_aliases, pattern_aliases=pattern_aliases)
+    _parser_cache = (license_aliases, combined_aliases, pattern_aliases, parser)
+    return parser
+
+
 def find_license_policy(license_id, license_policies, license_aliases=None, combined_aliases=None, pattern_aliases=None):
     """Finds the policy for a given license ID with SPDX expression support."""
-    # Initialize SPDX parser with aliases from policy
-    parser = SPDXExpressionParser(license_aliases=license_aliases, combined_aliases=combined_aliases, pattern_aliases=pattern_aliases)
-    
+    # Reuse the SPDX parser built from the aliases in the policy
+    parser = get_expression_parser(license_aliases, combined_aliases, pattern_aliases)
+
     # Parse and evaluate SPDX expression
     policy, explanation = parser.parse_and_evaluate(license_id, license_policies)
     
-    logging.debug(f"License policy evaluation: '{license_id}' → {policy} ({explanation})")
+    logging.debug("License policy evaluation: '%s' → %s (%s)", license_id, policy, explanation)
     return policy
 
 
@@ -255,6 +291,7 @@ def generate_summary_table(total_packages, internal_packages, gh_actions_count,
         method_descriptions = {
             'deps.dev': '🌐 Google deps.dev API',
             'spdx_fuzzy': '🎯 SPDX Fuzzy Matching', 
+            'license_url': '🔗 Known License URL',
             'ai_assisted': '🤖 AI-Powered Resolution',
             'pom_fallback': '📄 Maven POM Analysis',
             'cache_hit': '💾 Cached Resolution',
@@ -311,18 +348,18 @@ def audit_component_with_resolution(component, license_policies, package_policie
         for pattern in internal_dependency_patterns:
             # Check both PURL and component name
             if (purl and re.match(pattern, purl)) or (component_name and re.match(pattern, component_name)):
-                logging.debug(f"  Skipping internal dependency: {purl or component_name} (matches pattern: '{pattern}')")
+                logging.debug("  Skipping internal dependency: %s (matches pattern: '%s')", purl or component_name, pattern)
                 return [{"package": f"{component_name}@{component_version}", "purl": purl, "policy": "internal"}]
     
-    logging.debug(f"Processing component: {component_name}@{component_version} ({purl})")
-    logging.debug(f"  License concluded: {license_concluded}")
+    logging.debug("Processing component: %s@%s (%s)", component_name, component_version, purl)
+    logging.debug("  License concluded: %s", license_concluded)
 
     # 1. Check for a specific package policy override
     package_policy = find_package_policy(purl, package_policies)
     if package_policy:
         policy = package_policy.get('usagePolicy')
         reason = package_policy.get('reason', 'N/A')
-        logging.debug(f"  PACKAGE POLICY OVERRIDE: {purl} -> {policy} (reason: {reason})")
+        logging.debug("  PACKAGE POLICY OVERRIDE: %s -> %s (reason: %s)", purl, policy, reason)
         return [{
             "package": f"{component_name}@{component_version}",
             "purl": purl,
@@ -331,7 +368,7 @@ def audit_component_with_resolution(component, license_policies, package_policie
         }]
 
     # 2. Handle cases with no license
-    if not license_concluded or license_concluded in ['NOASSERTION', 'NONE', 'UNKNOWN']:
+    if not license_concluded or license_concluded in MISSING_LICENSE_VALUES:
         # For Maven packages, try POM fallback before giving up (Issue #19)
         if purl and purl.startswith('pkg:maven/') and license_resolver:
             logging.info(f"🔍 No license for Maven package {component_name}@{component_version}, trying POM fallback...")
@@ -407,14 +444,15 @@ def audit_component_with_resolution(component, license_policies, package_policie
     resolved_license = license_concluded
     resolution_info = None
     
-    # Check if license needs resolution
-    needs_resolution = (
-        license_concluded in ['non-standard', 'Weird unknown license'] or
-        find_license_policy(license_concluded, license_policies, license_aliases, combined_aliases, pattern_aliases) is None
-    )
+    # Check if license needs resolution; the concluded license is evaluated at most once
+    concluded_evaluated = license_concluded not in AMBIGUOUS_LICENSE_VALUES
+    concluded_policy = None
+    if concluded_evaluated:
+        concluded_policy = find_license_policy(license_concluded, license_policies, license_aliases, combined_aliases, pattern_aliases)
+    needs_resolution = concluded_policy is None
     
     if needs_resolution and license_resolver:
-        logging.debug(f"🔍 Attempting to resolve unknown license: '{license_concluded}'")
+        logging.debug("🔍 Attempting to resolve unknown license: '%s'", license_concluded)
         
         # Try to get the original license name from enrichment metadata
         original_license_name = license_concluded
@@ -436,8 +474,8 @@ def audit_component_with_resolution(component, license_policies, package_policie
                 'confidence': resolution_result['confidence']
             }
             
-            logging.debug(f"✅ Resolved '{original_license_name}' → '{resolved_license}' "
-                        f"({resolution_result['method']})")
+            logging.debug("✅ Resolved '%s' → '%s' (%s)",
+                          original_license_name, resolved_license, resolution_result['method'])
             
             # Update component with resolution info
             if 'enrichment' not in component:
@@ -449,11 +487,14 @@ def audit_component_with_resolution(component, license_policies, package_policie
 
     # 4. Check policy for the (potentially resolved) license
     final_license = resolved_license
-    license_policy = find_license_policy(final_license, license_policies, license_aliases, combined_aliases, pattern_aliases)
+    if concluded_evaluated and final_license == license_concluded:
+        license_policy = concluded_policy
+    else:
+        license_policy = find_license_policy(final_license, license_policies, license_aliases, combined_aliases, pattern_aliases)
     
     if license_policy:
         policy = license_policy
-        logging.debug(f"  Found policy for {final_license}: {policy}")
+        logging.debug("  Found policy for %s: %s", final_license, policy)
     else:
         policy = "needs-review"
         logging.warning(f"  No policy found for license '{final_license}'. Marking for review.")
@@ -580,6 +621,8 @@ def audit_licenses_with_resolution(sbom_path, policy_path, package_policy_path=N
     # Handle nested SBOM structure
     sbom_content = sbom_data.get("sbom", sbom_data)
     components = extract_components(sbom_content)
+    # Only the components are audited; release the rest of the document (relationships, files, ...)
+    del sbom_data, sbom_content
     
     logging.info(f"Starting audit of {len(components)} components...")
     
@@ -665,14 +708,15 @@ def audit_licenses_with_resolution(sbom_path, policy_path, package_policy_path=N
     )
 
     # Print summary
-    print(f"✅ Audit completed. {len(all_audit_results)} components processed.")
+    out = [f"✅ Audit completed. {len(all_audit_results)} components processed.\n"]
     if resolution_stats:
         total_resolved = sum(resolution_stats.values())
-        print(f"🎯 Licenses resolved: {total_resolved}")
+        out.append(f"🎯 Licenses resolved: {total_resolved}\n")
     
-    print("\n📊 License Policy Summary:")
+    out.append("\n📊 License Policy Summary:\n")
     for policy, count in sorted(policy_counts.items()):
-        print(f"  {policy}: {count}")
+        out.append(f"  {policy}: {count}\n")
+    sys.stdout.write(''.join(out))
 
     # Generate AI summary if requested
     ai_summary = None
@@ -729,55 +773,57 @@ def audit_licenses_with_resolution(sbom_path, policy_path, package_policy_path=N
 
 def generate_markdown_report(denied, needs_review, internal, allowed, ai_summary=None, resolution_stats=None):
     """Generates a markdown report for the audit results."""
-    report = ""
+    # Collect all report lines and emit them with a single write
+    out = []
     
     if ai_summary:
-        report += f"{ai_summary}\n\n"
+        out.append(f"{ai_summary}\n\n")
     
     if resolution_stats:
-        report += "### 🎯 License Resolution Statistics\n\n"
-        report += "| Resolution Method | Count |\n"
-        report += "| :--- | :---: |\n"
+        out.append("### 🎯 License Resolution Statistics\n\n")
+        out.append("| Resolution Method | Count |\n")
+        out.append("| :--- | :---: |\n")
         for method, count in sorted(resolution_stats.items()):
-            report += f"| {method} | {count} |\n"
-        report += "\n"
+            out.append(f"| {method} | {count} |\n")
+        out.append("\n")
     
-    report += "## License Audit Report\n\n"
+    out.append("## License Audit Report\n\n")
     
     if denied:
-        report += "### ❌ DENIED PACKAGES\n\n"
-        report += "| Package | License | Policy | PURL |\n"
-        report += "| :--- | :--- | :--- | :--- |\n"
+        out.append("### ❌ DENIED PACKAGES\n\n")
+        out.append("| Package | License | Policy | PURL |\n")
+        out.append("| :--- | :--- | :--- | :--- |\n")
         for item in denied:
             license_display = item.get('license_original', item.get('license', 'N/A'))
             if 'resolution' in item:
                 license_display += f" → **{item['license']}**"
-            report += f"| `{item['package']}` | `{license_display}` | **{item['policy']}** | `{item['purl']}` |\n"
-        report += "\n"
+            out.append(f"| `{item['package']}` | `{license_display}` | **{item['policy']}** | `{item['purl']}` |\n")
+        out.append("\n")
     
     if needs_review:
-        report += "### ⚠️ PACKAGES NEEDING REVIEW\n\n"
-        report += "| Package | License | Policy | PURL |\n"
-        report += "| :--- | :--- | :--- | :--- |\n"
+        out.append("### ⚠️ PACKAGES NEEDING REVIEW\n\n")
+        out.append("| Package | License | Policy | PURL |\n")
+        out.append("| :--- | :--- | :--- | :--- |\n")
         for item in needs_review:
             license_display = item.get('license_original', item.get('license', 'N/A'))
             if 'resolution' in item:
                 license_display += f" → **{item['license']}**"
-            report += f"| `{item['package']}` | `{license_display}` | {item['policy']} | `{item['purl']}` |\n"
-        report += "\n"
+            out.append(f"| `{item['package']}` | `{license_display}` | {item['policy']} | `{item['purl']}` |\n")
+        out.append("\n")
 
     if internal:
-        report += "### 🏠 SKIPPED INTERNAL PACKAGES\n\n"
-        report += "| Package | PURL |\n"
-        report += "| :--- | :--- |\n"
+        out.append("### 🏠 SKIPPED INTERNAL PACKAGES\n\n")
+        out.append("| Package | PURL |\n")
+        out.append("| :--- | :--- |\n")
         for item in internal:
-            report += f"| `{item['package']}` | `{item['purl']}` |\n"
-        report += "\n"
+            out.append(f"| `{item['package']}` | `{item['purl']}` |\n")
+        out.append("\n")
 
     if not denied and not needs_review:
-        report += "✅ **All packages conform to the license policy.**\n\n"
+        out.append("✅ **All packages conform to the license policy.**\n\n")
     
-    print(report)
+    out.append("\n")
+    sys.stdout.write(''.join(out))
 
 
 if __name__ == "__main__":
@@ -855,8 +901,7 @@ if __name__ == "__main__":
         print(f"💾 Results saved to {args.output}")
     elif not force_markdown:
         # Print detailed results to stdout only if not in markdown mode
-        print(f"\n📋 Detailed Results:")
-        print(json.dumps(results, indent=2))
+        sys.stdout.write(f"\n📋 Detailed Results:\n{json.dumps(results, indent=2)}\n")
 
     # Exit with appropriate status code based on audit results
     denied = results.get('denied', [])
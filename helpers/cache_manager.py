@@ -4,11 +4,72 @@
 
 import os
 import json
+import time
+import atexit
+import threading
 import hashlib
 import logging
+from collections import OrderedDict
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, List, Tuple
+
+# Cache files are machine-only, so they are written as compact JSON.
+# They are deliberately not compressed per file: the format is shared with the
+# organizational cache repository, entries are far smaller than a filesystem
+# block, and actions/cache already compresses the directory as a whole.
+CACHE_JSON_SEPARATORS = (',', ':')
+
+# Number of pending organizational cache entries that triggers a batched commit
+ORG_UPLOAD_BATCH_SIZE = 100
+
+# Attempts at committing a batch when concurrent jobs move the cache repository's main branch
+ORG_UPLOAD_ATTEMPTS = 3
+
+# Number of organizational cache blobs downloaded concurrently
+ORG_FETCH_WORKERS = 16
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Number of expired cache files unlinked concurrently during cleanup
+CLEANUP_WORKERS = 8
+
+# Instances handed out by SBOMCacheManager.shared(), keyed by (cache dir, TTL, token)
+_SHARED_INSTANCES: Dict[tuple, "SBOMCacheManager"] = {}
+
+
+@lru_cache(maxsize=16384)
+def _hash_cache_key(purl: str) -> str:
+    """Hash a PURL into a cache key; memoized since lookup and store ask for the same PURLs."""
+    # Normalize PURL and create a hash for filename safety.
+    # Keys are file names shared with existing local and organizational caches,
+    # so the hash scheme must stay stable.
+    clean_purl = purl.lower().strip()
+    return hashlib.sha256(clean_purl.encode()).hexdigest()[:16]
+
+
+def _fingerprint(package_data: Optional[Dict[str, Any]]) -> str:
+    """Serialize package data canonically, to detect changes even if a caller mutated the cached object."""
+    return json.dumps(package_data, sort_keys=True, separators=CACHE_JSON_SEPARATORS)
+
+
+def _unlink_cache_file(path: str, cutoff: float) -> bool:
+    """Delete a cache file unless it was rewritten after the cutoff, returning whether it was removed by this call."""
+    try:
+        # Entries refreshed since the scan (e.g. by a concurrent enrichment) are kept
+        if os.stat(path).st_mtime >= cutoff:
+            return False
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logging.warning(f"Failed to remove expired cache file {path}: {e}")
+        return False
+
 
 class SBOMCacheManager:
     """
@@ -20,7 +81,8 @@ class SBOMCacheManager:
     - Organization-wide cache sharing via GitHub API
     """
     
-    def __init__(self, cache_dir: str = None, cache_ttl_hours: int = 168, github_token: str = None):
+    def __init__(self, cache_dir: str = None, cache_ttl_hours: int = 168, github_token: str = None,
+                 max_mem_entries: int = 4096):
         """
         Initialize the cache manager.
         
@@ -28,52 +90,176 @@ class SBOMCacheManager:
             cache_dir: Directory for cache storage. Defaults to ./sbom_cache
             cache_ttl_hours: Time-to-live for cache entries in hours
             github_token: GitHub token for organization-wide cache sharing
+            max_mem_entries: Maximum number of entries kept in the in-memory LRU layer
         """
         self.cache_dir = Path(cache_dir or "./sbom_cache")
         self.cache_ttl = timedelta(hours=cache_ttl_hours)
+        self.ttl_seconds = self.cache_ttl.total_seconds()
         self.cache_dir.mkdir(exist_ok=True)
         
+        # In-memory LRU layer: cache_key -> (cached_at epoch seconds, package_data, fingerprint when
+        # written by this process, or None for entries read from disk)
+        self.max_mem_entries = max_mem_entries
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        # Directory index: cache_key -> mtime of its cache file, built by one scan on first lookup
+        self._index: Optional[Dict[str, float]] = None
+        
+        # Serializes lookups and writes, which share the memory layer and index, across threads
+        self._lock = threading.RLock()
+        
         # GitHub Actions cache integration
         self.github_cache_enabled = os.getenv('GITHUB_ACTIONS') == 'true'
         self.organization = os.getenv('GITHUB_REPOSITORY_OWNER', '')
         self.repository = os.getenv('GITHUB_REPOSITORY', '')
         self.github_token = github_token or os.getenv('GITHUB_TOKEN')
         
-        # Organization-wide cache settings
-        self.org_cache_enabled = bool(self.github_token and self.organization)
+        # Organization-wide cache settings (SBOM_DISABLE_ORG_CACHE opts out)
+        self.org_cache_enabled = bool(self.github_token and self.organization) and not os.getenv('SBOM_DISABLE_ORG_CACHE')
+        # Set once the organizational cache was loaded; the load lock lets one thread do it
+        self._org_cache_loaded = threading.Event()
+        self._org_load_lock = threading.Lock()
+        self._http = None
         if self.org_cache_enabled:
             self.cache_repo = f"{self.organization}/sbom-cache"
             self.api_base = f"https://api.github.com/repos/{self.cache_repo}/contents"
+            self.git_api_base = f"https://api.github.com/repos/{self.cache_repo}/git"
+        
+        # Organizational cache uploads are collected and committed in batches
+        self._pending_uploads: List[Tuple[str, str]] = []
+        self._upload_lock = threading.Lock()
+        # Set by a failed flush; from then on only the final and atexit flushes upload
+        self._org_upload_failed = False
+        if self.org_cache_enabled:
+            atexit.register(self._flush_org_cache_at_exit)
         
         logging.info(f"Cache manager initialized: dir={self.cache_dir}, ttl={cache_ttl_hours}h, org={self.organization}, org_cache={self.org_cache_enabled}")
+    
+    @classmethod
+    def shared(cls, cache_dir: str = None, cache_ttl_hours: int = 168,
+               github_token: str = None) -> "SBOMCacheManager":
+        """
+        Return the process-wide cache manager for a cache directory.
         
-        # Load organizational cache on initialization
-        if self.org_cache_enabled:
-            self._load_organizational_cache()
+        Repeated calls with the same settings reuse one instance, so its memory
+        layer, directory index and organizational cache load are shared instead
+        of being rebuilt by every caller.
+        
+        Args:
+            cache_dir: Directory for cache storage. Defaults to ./sbom_cache
+            cache_ttl_hours: Time-to-live for cache entries in hours
+            github_token: GitHub token for organization-wide cache sharing
+            
+        Returns:
+            The shared SBOMCacheManager for these settings
+        """
+        key = (str(Path(cache_dir or "./sbom_cache").resolve()), cache_ttl_hours, github_token)
+        instance = _SHARED_INSTANCES.get(key)
+        if instance is None:
+            instance = _SHARED_INSTANCES[key] = cls(cache_dir, cache_ttl_hours, github_token)
+        return instance
+    
+    def ensure_org_cache_loaded(self) -> None:
+        """
+        Load the organizational cache once, on the first lookup that misses memory.
+        
+        Must be called without holding the manager lock: the network-bound load
+        only blocks the threads that wait for it, not memory cache hits.
+        """
+        if self._org_cache_loaded.is_set():
+            return
+        
+        with self._org_load_lock:
+            if self._org_cache_loaded.is_set():
+                return
+            
+            try:
+                if self.org_cache_enabled and self._load_organizational_cache() > 0:
+                    # Loaded entries were written to the cache directory; rescan it on next use
+                    with self._lock:
+                        self._index = None
+            finally:
+                self._org_cache_loaded.set()
+    
+    def _get_http_session(self):
+        """
+        Return the keep-alive HTTP session used for all organizational cache requests.
+        
+        The session is created on first use with the GitHub headers and a retry
+        policy, so the load and every flush share pooled connections.
+        """
+        if self._http is None:
+            from http_utils import make_session
+            
+            self._http = make_session(pool_size=ORG_FETCH_WORKERS, headers={
+                "Authorization": f"Bearer {self.github_token}",
+                "Accept": "application/vnd.github.v3+json"
+            })
+        return self._http
     
     def _get_cache_key(self, purl: str) -> str:
         """Generate a stable cache key for a PURL."""
-        # Normalize PURL and create a hash for filename safety
-        clean_purl = purl.lower().strip()
-        return hashlib.sha256(clean_purl.encode()).hexdigest()[:16]
+        return _hash_cache_key(purl)
     
     def _get_cache_file_path(self, cache_key: str) -> Path:
         """Get the full path for a cache file."""
         return self.cache_dir / f"{cache_key}.json"
     
-    def _is_cache_valid(self, cache_file: Path) -> bool:
-        """Check if a cache file is still valid based on TTL."""
-        if not cache_file.exists():
-            return False
-        
+    def _get_cache_mtime(self, cache_file: Path) -> Optional[float]:
+        """Return the modification time of a cache file, or None if it does not exist."""
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
-            
-            cached_time = datetime.fromisoformat(cache_data.get('cached_at', '1970-01-01'))
-            return datetime.now() - cached_time < self.cache_ttl
-        except (json.JSONDecodeError, ValueError, KeyError):
+            return cache_file.stat().st_mtime
+        except FileNotFoundError:
+            return None
+    
+    def _is_cache_valid(self, cache_file: Path, now: Optional[float] = None) -> bool:
+        """
+        Check if a cache file is still valid based on TTL.
+        
+        The file's mtime is the freshness signal (it is set when the entry is
+        written), so no file has to be opened and parsed for this check.
+        
+        Args:
+            cache_file: Cache file to check
+            now: Current epoch time; pass a snapshot when checking many files
+        """
+        mtime = self._get_cache_mtime(cache_file)
+        if mtime is None:
             return False
+        if now is None:
+            now = time.time()
+        return now - mtime < self.ttl_seconds
+    
+    def _get_index(self) -> Dict[str, float]:
+        """
+        Return the index of cache files in the cache directory.
+        
+        The directory is scanned once; afterwards lookups for unknown keys are
+        answered without probing the filesystem.
+        """
+        if self._index is None:
+            self._index = {entry.name[:-len('.json')]: mtime for entry, mtime in self._scan_cache_files()}
+        return self._index
+    
+    def _scan_cache_files(self) -> List[Tuple[os.DirEntry, float]]:
+        """List the cache files with their mtimes using a single directory scan."""
+        cache_files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    try:
+                        cache_files.append((entry, entry.stat().st_mtime))
+                    except FileNotFoundError:
+                        continue
+        return cache_files
+    
+    def _remember(self, cache_key: str, cached_at: float, package_data: Optional[Dict[str, Any]],
+                  fingerprint: Optional[str] = None) -> None:
+        """Store an entry in the in-memory LRU layer, evicting the oldest entries if full."""
+        self._mem[cache_key] = (cached_at, package_data, fingerprint)
+        self._mem.move_to_end(cache_key)
+        while len(self._mem) > self.max_mem_entries:
+            self._mem.popitem(last=False)
     
     def get_cached_package_info(self, purl: str) -> Optional[Dict[str, Any]]:
         """
@@ -86,23 +272,40 @@ class SBOMCacheManager:
             Cached package data or None if not found/expired
         """
         cache_key = self._get_cache_key(purl)
-        cache_file = self._get_cache_file_path(cache_key)
+        with self._lock:
+            # Serve repeated lookups from memory without touching the disk
+            mem_entry = self._mem.get(cache_key)
+            if mem_entry is not None:
+                cached_at, package_data, _ = mem_entry
+                if time.time() - cached_at < self.ttl_seconds:
+                    self._mem.move_to_end(cache_key)
+                    logging.debug("Memory cache hit for %s (key: %s)", purl, cache_key)
+                    return package_data
+                del self._mem[cache_key]
         
-        if not self._is_cache_valid(cache_file):
-            logging.debug(f"Cache miss for {purl} (key: {cache_key})")
-            return None
+        self.ensure_org_cache_loaded()
         
-        try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
+        with self._lock:
+            cache_file = self._get_cache_file_path(cache_key)
             
-            logging.debug(f"Cache hit for {purl} (key: {cache_key})")
-            return cache_data.get('package_data')
-        except (json.JSONDecodeError, FileNotFoundError):
-            logging.warning(f"Invalid cache file for {purl}, removing...")
-            cache_file.unlink(missing_ok=True)
-            return None
-    
+            cached_at = self._get_index().get(cache_key)
+            if cached_at is None or time.time() - cached_at >= self.ttl_seconds:
+                logging.debug("Cache miss for %s (key: %s)", purl, cache_key)
+                return None
+            
+            try:
+                cache_data = json.loads(cache_file.read_bytes())
+                
+                logging.debug("Cache hit for %s (key: %s)", purl, cache_key)
+                package_data = cache_data.get('package_data')
+                self._remember(cache_key, cached_at, package_data)
+                return package_data
+            except (json.JSONDecodeError, FileNotFoundError):
+                logging.warning(f"Invalid cache file for {purl}, removing...")
+                cache_file.unlink(missing_ok=True)
+                self._get_index().pop(cache_key, None)
+                return None
+        
     def cache_package_info(self, purl: str, package_data: Dict[str, Any]) -> None:
         """
         Cache package information for a PURL.
@@ -111,36 +314,93 @@ class SBOMCacheManager:
             purl: Package URL 
             package_data: Package information to cache
         """
-        cache_key = self._get_cache_key(purl)
-        cache_file = self._get_cache_file_path(cache_key)
-        
-        cache_entry = {
-            'purl': purl,
-            'package_data': package_data,
-            'cached_at': datetime.now().isoformat(),
-            'organization': self.organization,
-            'repository': self.repository,
-            'cache_version': '1.0'
-        }
-        
-        try:
-            # Save to local cache
-            with open(cache_file, 'w') as f:
-                json.dump(cache_entry, f, indent=2)
+        flush_needed = False
+        with self._lock:
+            cache_key = self._get_cache_key(purl)
+            cache_file = self._get_cache_file_path(cache_key)
             
-            logging.debug(f"Cached package info for {purl} (key: {cache_key})")
+            now = datetime.now()
+            cache_entry = {
+                'purl': purl,
+                'package_data': package_data,
+                'cached_at': now.isoformat(),
+                'organization': self.organization,
+                'repository': self.repository,
+                'cache_version': '1.0'
+            }
             
-            # Also save to organizational cache (async)
-            if self.org_cache_enabled:
-                self._save_to_organizational_cache(cache_key, cache_entry)
+            # Make the entry visible to subsequent lookups in this process
+            previous = self._mem.get(cache_key)
+            fingerprint = _fingerprint(package_data)
+            self._remember(cache_key, now.timestamp(), package_data, fingerprint)
+            
+            try:
+                if self._is_unchanged(cache_key, cache_file, package_data, fingerprint, previous):
+                    # Same content as on disk: only refresh the mtime, which restarts the TTL
+                    try:
+                        os.utime(cache_file)
+                        refreshed_mtime = cache_file.stat().st_mtime
+                    except FileNotFoundError:
+                        # Removed by a concurrent expired cache cleanup after the check; write it again
+                        refreshed_mtime = None
+                    if refreshed_mtime is not None:
+                        if self._index is not None:
+                            self._index[cache_key] = refreshed_mtime
+                        logging.debug("Refreshed unchanged cache entry for %s (key: %s)", purl, cache_key)
+                        return
                 
-        except Exception as e:
-            logging.warning(f"Failed to cache package info for {purl}: {e}")
+                # Serialize once; the same text is written locally and uploaded to the organizational cache
+                content = json.dumps(cache_entry, separators=CACHE_JSON_SEPARATORS)
+                
+                # Save to local cache
+                cache_file.write_text(content)
+                if self._index is not None:
+                    self._index[cache_key] = now.timestamp()
+                
+                logging.debug("Cached package info for %s (key: %s)", purl, cache_key)
+                
+                # Also save to organizational cache (async)
+                if self.org_cache_enabled:
+                    flush_needed = self._save_to_organizational_cache(cache_key, content)
+                    
+            except Exception as e:
+                logging.warning(f"Failed to cache package info for {purl}: {e}")
+        
+        # A full batch is committed without holding the lock, so other workers keep going meanwhile
+        if flush_needed:
+            self.flush_org_cache()
+        
+    def _is_unchanged(self, cache_key: str, cache_file: Path, package_data: Dict[str, Any],
+                      fingerprint: str, previous: Optional[tuple]) -> bool:
+        """
+        Check whether the cache file already holds exactly this package data.
+        
+        Args:
+            cache_key: Cache key of the entry
+            cache_file: Path of the entry's cache file
+            package_data: Package information about to be cached
+            fingerprint: _fingerprint() of package_data
+            previous: The entry's in-memory (cached_at, package_data, fingerprint) before this call, if any
+            
+        Returns:
+            True if rewriting the file would produce the same package data
+        """
+        if previous is not None and previous[2] is not None and self._index is not None and cache_key in self._index:
+            # The fingerprint was taken when the entry was written; the cached object
+            # itself may be the caller's, mutated since then
+            return previous[2] == fingerprint
+        if self._index is not None and cache_key not in self._index:
+            return False
+        try:
+            return json.loads(cache_file.read_bytes()).get('package_data') == package_data
+        except (OSError, ValueError):
+            return False
     
     def get_cache_stats(self) -> Dict[str, int]:
         """Get statistics about the current cache."""
-        cache_files = list(self.cache_dir.glob("*.json"))
-        valid_files = sum(1 for f in cache_files if self._is_cache_valid(f))
+        cache_files = self._scan_cache_files()
+        now = time.time()
+        valid_files = sum(1 for _, mtime in cache_files if now - mtime < self.ttl_seconds)
         
         return {
             'total_entries': len(cache_files),
@@ -149,17 +409,29 @@ class SBOMCacheManager:
         }
     
     def cleanup_expired_cache(self) -> int:
-        """Remove expired cache entries and return the number of files removed."""
-        removed = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            if not self._is_cache_valid(cache_file):
-                try:
-                    cache_file.unlink()
-                    removed += 1
-                    logging.debug(f"Removed expired cache file: {cache_file.name}")
-                except Exception as e:
-                    logging.warning(f"Failed to remove expired cache file {cache_file}: {e}")
+        """
+        Remove expired cache entries and return the number of files removed.
+        
+        Safe to run while entries are being looked up and written; entries
+        rewritten after the scan are left in place.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        expired = [entry for entry, mtime in self._scan_cache_files() if mtime <= cutoff]
+        if not expired:
+            return 0
         
+        # Unlinks are independent metadata operations, so they are issued concurrently
+        with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as executor:
+            results = list(executor.map(_unlink_cache_file, (entry.path for entry in expired), repeat(cutoff)))
+        
+        with self._lock:
+            if self._index is not None:
+                for entry, unlinked in zip(expired, results):
+                    key = entry.name[:-len('.json')]
+                    if unlinked and self._index.get(key, cutoff) <= cutoff:
+                        self._index.pop(key, None)
+        
+        removed = sum(results)
         if removed > 0:
             logging.info(f"Cleaned up {removed} expired cache entries")
         
@@ -196,9 +468,10 @@ class SBOMCacheManager:
         org_key = self.organization or "default"
         
         # Try previous days as fallback
+        now = datetime.now()
         restore_keys = []
         for days_back in range(1, 8):  # Last 7 days
-            date_key = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+            date_key = (now - timedelta(days=days_back)).strftime("%Y-%m-%d")
             restore_keys.append(f"sbom-cache-{org_key}-{date_key}")
         
         # Fallback to any cache from this org
@@ -210,6 +483,9 @@ class SBOMCacheManager:
         """
         Load cache entries from organization-wide cache repository.
         
+        The recent month directories are listed with a single GraphQL query and
+        the entry blobs are then downloaded in parallel.
+        
         Returns:
             Number of cache entries loaded
         """
@@ -220,37 +496,47 @@ class SBOMCacheManager:
             import requests
             import base64
             
+            session = self._get_http_session()
+            now = datetime.now()
+            # Month directories covering the last 7 days, newest first
+            date_prefixes = list(dict.fromkeys(
+                (now - timedelta(days=days_back)).strftime("%Y/%m") for days_back in range(7)
+            ))
+            files = self._list_organizational_cache_files(date_prefixes)
+            
+            def fetch_blob(oid: str) -> Optional[bytes]:
+                try:
+                    response = session.get(f"{self.git_api_base}/blobs/{oid}", timeout=10)
+                    response.raise_for_status()
+                    return base64.b64decode(response.json()['content'])
+                except (requests.RequestException, KeyError, ValueError):
+                    # Skip failed downloads, continue with local cache
+                    return None
+            
+            # Download blobs concurrently; decoding and writing stay in this thread
+            names = list(files)
+            with ThreadPoolExecutor(max_workers=ORG_FETCH_WORKERS) as executor:
+                blobs = list(executor.map(fetch_blob, files.values()))
+            
             loaded = 0
-            # Try to load recent cache entries
-            for days_back in range(7):  # Last 7 days
-                date_prefix = (datetime.now() - timedelta(days=days_back)).strftime("%Y/%m")
-                cache_dir_path = f"cache/{date_prefix}"
-                
-                headers = {
-                    "Authorization": f"Bearer {self.github_token}",
-                    "Accept": "application/vnd.github.v3+json"
-                }
-                
+            for name, blob in zip(names, blobs):
+                if blob is None:
+                    continue
                 try:
-                    response = requests.get(f"{self.api_base}/{cache_dir_path}", headers=headers, timeout=10)
-                    if response.status_code == 200:
-                        files = response.json()
-                        for file_info in files:
-                            if file_info['name'].endswith('.json'):
-                                # Download and cache locally
-                                file_content = base64.b64decode(file_info['content']).decode('utf-8')
-                                cache_data = json.loads(file_content)
-                                
-                                # Check if still valid
-                                cached_time = datetime.fromisoformat(cache_data.get('cached_at', '1970-01-01'))
-                                if datetime.now() - cached_time < self.cache_ttl:
-                                    local_file = self.cache_dir / file_info['name']
-                                    with open(local_file, 'w') as f:
-                                        json.dump(cache_data, f, indent=2)
-                                    loaded += 1
-                except requests.RequestException:
-                    # Skip failed requests, continue with local cache
+                    cache_data = json.loads(blob)
+                    cached_time = datetime.fromisoformat(cache_data.get('cached_at', '1970-01-01'))
+                except ValueError:
                     continue
+                
+                # Check if still valid
+                if now - cached_time < self.cache_ttl:
+                    local_file = self.cache_dir / name
+                    # The blob already is the serialized entry, so it is stored as downloaded
+                    local_file.write_bytes(blob)
+                    # Keep the original cache time as mtime so the TTL is not extended
+                    cached_ts = cached_time.timestamp()
+                    os.utime(local_file, (cached_ts, cached_ts))
+                    loaded += 1
             
             if loaded > 0:
                 logging.info(f"Loaded {loaded} cache entries from organizational cache")
@@ -260,51 +546,162 @@ class SBOMCacheManager:
             logging.warning(f"Failed to load organizational cache: {e}")
             return 0
     
-    def _save_to_organizational_cache(self, cache_key: str, cache_entry: Dict[str, Any]) -> None:
+    def _list_organizational_cache_files(self, date_prefixes: List[str]) -> Dict[str, str]:
+        """
+        List the cache files of several month directories with one GraphQL query.
+        
+        Args:
+            date_prefixes: "YYYY/MM" directory prefixes below cache/, newest first
+            
+        Returns:
+            Mapping of cache file name to blob oid; newer months win on duplicate names
+        """
+        fields = " ".join(
+            f'm{i}: object(expression: "main:cache/{prefix}") {{ ... on Tree {{ entries {{ name oid }} }} }}'
+            for i, prefix in enumerate(date_prefixes)
+        )
+        query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+        owner, name = self.cache_repo.split("/", 1)
+        
+        response = self._get_http_session().post(GITHUB_GRAPHQL_URL, json={
+            "query": query,
+            "variables": {"owner": owner, "name": name}
+        }, timeout=10)
+        response.raise_for_status()
+        repository = (response.json().get("data") or {}).get("repository") or {}
+        
+        files: Dict[str, str] = {}
+        for i in range(len(date_prefixes)):
+            tree = repository.get(f"m{i}") or {}
+            for entry in tree.get("entries", []):
+                if entry["name"].endswith(".json"):
+                    files.setdefault(entry["name"], entry["oid"])
+        return files
+    
+    def _save_to_organizational_cache(self, cache_key: str, content: str) -> bool:
         """
-        Save cache entry to organization-wide cache repository.
+        Queue a cache entry for the organization-wide cache repository.
+        
+        Entries are committed in batches by flush_org_cache(), which the caller
+        runs once ORG_UPLOAD_BATCH_SIZE entries are pending, and at interpreter exit.
+        After a failed flush, entries only accumulate for the final flush, so a
+        failing upload is not repeated with a growing batch for every new entry.
         
         Args:
             cache_key: Cache key for the entry
-            cache_entry: Cache data to save
+            content: Serialized cache entry to save
+            
+        Returns:
+            True if a full batch is pending and should be flushed
         """
         if not self.org_cache_enabled:
-            return
+            return False
+        
+        # Generate path in shared repository
+        date_prefix = datetime.now().strftime("%Y/%m")
+        cache_path = f"cache/{date_prefix}/{cache_key}.json"
+        
+        with self._upload_lock:
+            self._pending_uploads.append((cache_path, content))
+            return not self._org_upload_failed and len(self._pending_uploads) >= ORG_UPLOAD_BATCH_SIZE
+    
+    def flush_org_cache(self) -> int:
+        """
+        Commit all pending cache entries to the organization-wide cache repository.
+        
+        Uses the Git Data API so that a whole batch becomes a single tree and
+        commit instead of one Contents API round-trip and commit per entry.
+        Entries of a batch that cannot be committed stay queued for the final
+        flush, and no further batches are flushed before it.
+        
+        Returns:
+            Number of cache entries committed
+        """
+        with self._upload_lock:
+            pending, self._pending_uploads = self._pending_uploads, []
+        
+        if not pending or not self.org_cache_enabled:
+            return 0
+        
+        # Later entries win on duplicate paths
+        entries = dict(pending)
         
         try:
-            import requests
-            import base64
-            
-            # Generate path in shared repository
-            date_prefix = datetime.now().strftime("%Y/%m")
-            cache_path = f"cache/{date_prefix}/{cache_key}.json"
+            session = self._get_http_session()
             
-            content = json.dumps(cache_entry, indent=2)
-            encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
+            for attempt in range(1, ORG_UPLOAD_ATTEMPTS + 1):
+                if self._commit_org_cache_entries(session, entries):
+                    logging.debug(f"Saved {len(entries)} cache entries to organizational repository")
+                    return len(entries)
+                logging.debug(f"Organizational cache branch moved during upload, retrying ({attempt}/{ORG_UPLOAD_ATTEMPTS})")
             
-            headers = {
-                "Authorization": f"Bearer {self.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            # Check if file exists
-            existing_response = requests.get(f"{self.api_base}/{cache_path}", headers=headers, timeout=10)
-            
-            data = {
-                "message": f"Update SBOM cache for {cache_entry.get('purl', 'unknown')}",
-                "content": encoded_content,
-                "branch": "main"
-            }
-            
-            if existing_response.status_code == 200:
-                data["sha"] = existing_response.json()["sha"]
-            
-            # Upload to shared repository
-            response = requests.put(f"{self.api_base}/{cache_path}", headers=headers, json=data, timeout=30)
-            
-            if response.status_code in [200, 201]:
-                logging.debug(f"Saved cache entry to organizational repository: {cache_path}")
+            raise RuntimeError(f"main branch kept moving for {ORG_UPLOAD_ATTEMPTS} attempts")
             
         except Exception as e:
-            logging.debug(f"Failed to save to organizational cache: {e}")
-            # Don't fail the main operation if org cache fails
+            # Don't fail the main operation if org cache fails; leave the entries to the final flush
+            with self._upload_lock:
+                self._pending_uploads[:0] = pending
+                self._org_upload_failed = True
+            logging.warning(f"Failed to save {len(entries)} entries to organizational cache, keeping them queued for the final flush: {e}")
+            return 0
+    
+    def _commit_org_cache_entries(self, session, entries: Dict[str, str]) -> bool:
+        """
+        Commit cache entries on top of the current head of the cache repository.
+        
+        Args:
+            session: HTTP session for the GitHub API
+            entries: Serialized cache entries by path in the repository
+            
+        Returns:
+            True if main now points at the new commit, False if main moved
+            meanwhile and the update was not a fast forward
+        """
+        # Resolve the current head commit and its tree
+        ref_response = session.get(f"{self.git_api_base}/ref/heads/main", timeout=10)
+        ref_response.raise_for_status()
+        head_sha = ref_response.json()["object"]["sha"]
+        
+        commit_response = session.get(f"{self.git_api_base}/commits/{head_sha}", timeout=10)
+        commit_response.raise_for_status()
+        base_tree = commit_response.json()["tree"]["sha"]
+        
+        # Create one tree containing all pending entries
+        tree_response = session.post(f"{self.git_api_base}/trees", json={
+            "base_tree": base_tree,
+            "tree": [
+                {
+                    "path": cache_path,
+                    "mode": "100644",
+                    "type": "blob",
+                    "content": content
+                }
+                for cache_path, content in entries.items()
+            ]
+        }, timeout=30)
+        tree_response.raise_for_status()
+        
+        new_commit_response = session.post(f"{self.git_api_base}/commits", json={
+            "message": f"Update SBOM cache ({len(entries)} entries from {self.repository or 'unknown'})",
+            "tree": tree_response.json()["sha"],
+            "parents": [head_sha]
+        }, timeout=30)
+        new_commit_response.raise_for_status()
+        
+        ref_update = session.patch(f"{self.git_api_base}/refs/heads/main", json={
+            "sha": new_commit_response.json()["sha"]
+        }, timeout=30)
+        # Another job moved main after it was read; GitHub rejects the non-fast-forward update
+        if ref_update.status_code == 422:
+            return False
+        ref_update.raise_for_status()
+        return True
+    
+    def _flush_org_cache_at_exit(self) -> None:
+        """Flush pending organizational cache entries at interpreter exit, reporting any that are lost."""
+        self.flush_org_cache()
+        with self._upload_lock:
+            lost = len(self._pending_uploads)
+            self._pending_uploads = []
+        if lost:
+            logging.warning(f"Dropped {lost} organizational cache entries that could not be saved")
@@ -7,16 +7,51 @@ import requests
 import argparse
 import re
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from tqdm import tqdm
+from http_utils import make_session
 
 # SPDX expression operators and keywords to filter out
 SPDX_OPERATORS = {'AND', 'OR', 'WITH', 'and', 'or', 'with'}
 
+# Precompiled patterns to detect and split on SPDX operators
+SPDX_OPERATOR_DETECT = re.compile(r'\s(?:AND|OR|WITH|and|or|with)\s')
+SPDX_OPERATOR_SPLIT = re.compile(r'\s+(?:AND|OR|WITH|and|or|with)\s+')
+SPDX_WITH_SPLIT = re.compile(r'\s+(?:WITH|with)\s+')
+
+# Number of license texts fetched concurrently
+FETCH_WORKERS = 16
+
+# Shared HTTP session so license fetches reuse pooled keep-alive connections
+SESSION = make_session(pool_size=32)
+
+# Pre-encoded markdown fragments surrounding each license text in the output
+LICENSE_HEADING = b"## "
+LICENSE_FENCE_OPEN = b"\n\n```\n"
+LICENSE_FENCE_CLOSE = b"\n```\n\n---\n\n"
+
+# License texts are immutable per SPDX id, so fetched texts are kept on disk without TTL;
+# they are written atomically and empty texts are never cached
+LICENSE_CACHE_DIR = Path(os.environ.get('SBOM_LICENSE_CACHE') or Path.home() / '.cache' / 'sbom_auditor' / 'spdx')
+
+# Only plain SPDX ids are used as cache file names
+CACHEABLE_ID_PATTERN = re.compile(r'^[A-Za-z0-9.+\-]+$')
+
+# License values (lowercased) that have no SPDX license text to fetch
+NO_TEXT_LICENSE_VALUES = frozenset({"internal", "not found", "non-standard", "noassertion", "none"})
+
 # Global variables for license aliases (loaded from policy)
 LICENSE_ALIASES = {}
 COMBINED_LICENSE_ALIASES = {}
 
 
+def warn(message):
+    """Print a warning without breaking the progress bar of concurrent license fetches."""
+    tqdm.write(f"Warning: {message}")
+
+
 def load_license_aliases(policy_path=None):
     """Load license aliases from policy file."""
     global LICENSE_ALIASES, COMBINED_LICENSE_ALIASES
@@ -38,7 +73,7 @@ def load_license_aliases(policy_path=None):
         
         print(f"Loaded {len(LICENSE_ALIASES)} license aliases and {len(COMBINED_LICENSE_ALIASES)} combined aliases from policy")
     except Exception as e:
-        print(f"Warning: Could not load license aliases from {policy_path}: {e}")
+        warn(f"Could not load license aliases from {policy_path}: {e}")
         LICENSE_ALIASES = {}
         COMBINED_LICENSE_ALIASES = {}
 
@@ -79,12 +114,12 @@ def parse_spdx_expression(expression):
         return []
     
     # Check if it's a simple license (no operators)
-    if not any(f' {op} ' in expression for op in SPDX_OPERATORS):
+    if not SPDX_OPERATOR_DETECT.search(expression):
         return [expression.strip()]
     
     # Split by SPDX operators (AND, OR, WITH)
     # Use regex to split while preserving case
-    parts = re.split(r'\s+(?:AND|OR|WITH|and|or|with)\s+', expression)
+    parts = SPDX_OPERATOR_SPLIT.split(expression)
     
     licenses = []
     for part in parts:
@@ -100,7 +135,7 @@ def parse_spdx_expression(expression):
 
 def get_license_text(license_id):
     """Fetches the license text from the SPDX license list details JSON."""
-    if not license_id or license_id.lower() in ["internal", "not found", "non-standard", "noassertion", "none"]:
+    if not license_id or license_id.lower() in NO_TEXT_LICENSE_VALUES:
         return None
     
     # First, apply the license ID mapping from policy
@@ -110,84 +145,123 @@ def get_license_text(license_id):
     # extract the base license (the part before WITH)
     fetch_id = spdx_id
     if ' WITH ' in spdx_id or ' with ' in spdx_id:
-        fetch_id = re.split(r'\s+(?:WITH|with)\s+', spdx_id)[0].strip()
+        fetch_id = SPDX_WITH_SPLIT.split(spdx_id)[0].strip()
     
+    # Serve previously fetched license texts from the local cache (empty files are refetched)
+    cache_path = LICENSE_CACHE_DIR / f"{fetch_id}.txt" if CACHEABLE_ID_PATTERN.match(fetch_id) else None
+    if cache_path is not None:
+        try:
+            cached_text = cache_path.read_text(encoding='utf-8')
+            if cached_text:
+                return cached_text
+        except OSError:
+            pass
+
     # Fetch license details from the JSON file for better reliability
     url = f"https://raw.githubusercontent.com/spdx/license-list-data/main/json/details/{fetch_id}.json"
     try:
-        response = requests.get(url)
+        response = SESSION.get(url, timeout=10)
         if response.status_code == 200:
-            return response.json().get("licenseText", "")
+            license_text = response.json().get("licenseText", "")
+            if cache_path is not None and license_text:
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Write to a temporary file first, so an interrupted run never leaves a truncated text behind
+                    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                    temp_path.write_text(license_text, encoding='utf-8')
+                    os.replace(temp_path, cache_path)
+                except OSError as e:
+                    warn(f"Could not cache license text for {fetch_id}: {e}")
+            return license_text
         else:
             # Only warn if it's not an expression (expressions are handled separately)
             if ' AND ' not in license_id and ' OR ' not in license_id:
-                print(f"Warning: Could not fetch license JSON for {license_id} (tried {fetch_id}) (Status: {response.status_code})")
+                warn(f"Could not fetch license JSON for {license_id} (tried {fetch_id}) (Status: {response.status_code})")
             return None
     except (requests.RequestException, json.JSONDecodeError) as e:
-        print(f"Warning: Request or JSON decode failed for {license_id} (tried {fetch_id}): {e}")
+        warn(f"Request or JSON decode failed for {license_id} (tried {fetch_id}): {e}")
         return None
 
+def read_license_strings(sbom_path):
+    """
+    Reads the distinct licenseConcluded values from an SBOM.
+    
+    Only these strings are returned, so the parsed SBOM document can be
+    released before the license texts are fetched and written.
+    """
+    with open(sbom_path, 'rb') as f:
+        sbom_data = json.loads(f.read())
+
+    # Handle SBOMs that have the content nested under an "sbom" key
+    sbom_content = sbom_data.get("sbom", sbom_data)
+
+    components = sbom_content.get("packages", []) or sbom_content.get("components", [])
+    return {pkg.get("licenseConcluded") for pkg in components} - {None, ""}
+
+
 def collect_licenses(sbom_path, output_path, policy_path=None):
     """Collects all unique licenses from an SBOM and writes them to a file."""
     # Load license aliases from policy
     load_license_aliases(policy_path)
     
-    with open(sbom_path, 'r') as f:
-        sbom_data = json.load(f)
-
-    # Handle SBOMs that have the content nested under an "sbom" key
-    sbom_content = sbom_data.get("sbom", sbom_data)
+    # Handle comma-separated licenses; each distinct entry is classified only once
+    license_entries = {
+        part.strip()
+        for license_string in read_license_strings(sbom_path)
+        for part in license_string.split(',')
+    }
 
     unique_licenses = set()
-    license_expressions = set()  # Track original expressions for documentation
+    license_expressions = {}  # Original expression -> individual licenses, for documentation
     
-    components = sbom_content.get("packages", []) or sbom_content.get("components", [])
-    for pkg in components:
-        license_string = pkg.get("licenseConcluded")
-        if license_string:
-            # Handle comma-separated licenses
-            licenses = license_string.split(',')
-            for license_expr in licenses:
-                license_expr = license_expr.strip()
-                
-                # Check if it's an SPDX expression (contains AND, OR, WITH)
-                if any(f' {op} ' in license_expr for op in SPDX_OPERATORS):
-                    license_expressions.add(license_expr)
-                    # Extract individual licenses from expression
-                    individual_licenses = parse_spdx_expression(license_expr)
-                    for lic in individual_licenses:
-                        unique_licenses.add(lic)
-                else:
-                    unique_licenses.add(license_expr)
+    for license_expr in license_entries:
+        # Check if it's an SPDX expression (contains AND, OR, WITH)
+        if SPDX_OPERATOR_DETECT.search(license_expr):
+            # Extract individual licenses from expression
+            individual_licenses = parse_spdx_expression(license_expr)
+            license_expressions[license_expr] = individual_licenses
+            unique_licenses.update(individual_licenses)
+        else:
+            unique_licenses.add(license_expr)
 
     print(f"Found {len(unique_licenses)} unique licenses.")
     if license_expressions:
         print(f"  (including {len(license_expressions)} combined license expressions)")
 
-    with open(output_path, 'w') as f:
-        f.write("# Collected Licenses\n\n")
-        f.write("This file contains the full text of all licenses found in the project's dependencies.\n\n")
-        
-        # Document combined license expressions
-        if license_expressions:
-            f.write("## Combined License Expressions\n\n")
-            f.write("The following combined license expressions were found. ")
-            f.write("Individual license texts are included below.\n\n")
-            for expr in sorted(license_expressions):
-                individual = parse_spdx_expression(expr)
-                f.write(f"- `{expr}` → {', '.join(individual)}\n")
-            f.write("\n---\n\n")
-
-        sorted_licenses = sorted(list(unique_licenses))
-
-        for license_id in tqdm(sorted_licenses, desc="Fetching Licenses"):
-            license_text = get_license_text(license_id)
-            if license_text:
-                f.write(f"## {license_id}\n\n")
-                f.write("```\n")
-                f.write(license_text)
-                f.write("\n```\n\n")
-                f.write("---\n\n")
+    # Assemble the whole document as encoded chunks and write it with a single call
+    chunks = [
+        b"# Collected Licenses\n\n",
+        b"This file contains the full text of all licenses found in the project's dependencies.\n\n",
+    ]
+    
+    # Document combined license expressions
+    if license_expressions:
+        chunks.append(b"## Combined License Expressions\n\n")
+        chunks.append(b"The following combined license expressions were found. ")
+        chunks.append(b"Individual license texts are included below.\n\n")
+        for expr, individual in sorted(license_expressions.items()):
+            chunks.append(f"- `{expr}` → {', '.join(individual)}\n".encode('utf-8'))
+        chunks.append(b"\n---\n\n")
+
+    sorted_licenses = sorted(list(unique_licenses))
+
+    # Fetch license texts concurrently; assembling stays serial to keep the order
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        license_texts = list(tqdm(
+            executor.map(get_license_text, sorted_licenses),
+            total=len(sorted_licenses),
+            desc="Fetching Licenses"
+        ))
+
+    for license_id, license_text in zip(sorted_licenses, license_texts):
+        if license_text:
+            chunks.extend((
+                LICENSE_HEADING, license_id.encode('utf-8'), LICENSE_FENCE_OPEN,
+                license_text.encode('utf-8'), LICENSE_FENCE_CLOSE
+            ))
+
+    with open(output_path, 'wb') as f:
+        f.write(b''.join(chunks))
 
     print(f"✅ All license texts written to {output_path}")
 
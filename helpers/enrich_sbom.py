@@ -7,34 +7,148 @@ Enhanced SBOM Enrichment with Intelligent License Resolution
 Enriches SBOM with license data from deps.dev and resolves unknown licenses using SPDX matching.
 """
 
-import json
 import requests
 import argparse
 import logging
 import os
 import sys
 import xml.etree.ElementTree as ET
+from functools import lru_cache, wraps
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
-import urllib.parse
 from urllib.parse import quote
 from cache_manager import SBOMCacheManager
+from http_utils import make_session, load_json, dump_json
 from license_resolver import LicenseResolver
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# deps.dev and Maven Central URL templates, filled in with %-formatting
+DEPSDEV_PACKAGE_URL = "https://api.deps.dev/v3alpha/systems/%s/packages/%s"
+DEPSDEV_VERSION_URL = "https://api.deps.dev/v3alpha/systems/%s/packages/%s/versions/%s"
+MAVEN_METADATA_URL = "https://repo1.maven.org/maven2/%s/%s/maven-metadata.xml"
+MAVEN_POM_URL = "https://repo1.maven.org/maven2/%s/%s/%s/%s-%s.pom"
 
-def get_maven_license_from_pom(package_name, version=None):
+# deps.dev batch endpoint for version lookups, the number of versions per request,
+# and the purl types it is used for (other purl types keep using single requests).
+# Go is left out: its purl type is "golang" and its module paths are not parsed into deps.dev names.
+DEPSDEV_BATCH_URL = "https://api.deps.dev/v3alpha/versionbatch"
+DEPSDEV_BATCH_SIZE = 500
+DEPSDEV_BATCH_SYSTEMS = {'npm', 'maven', 'pypi', 'cargo', 'nuget'}
+
+# POM element paths; {*} matches the Maven POM namespace as well as POMs without one
+POM_LICENSE_NAME_PATH = './/{*}licenses/{*}license/{*}name'
+POM_PARENT_PATH = './/{*}parent'
+
+# SPDX IDs of the Eclipse licenses deps.dev reports next to "non-standard"
+ECLIPSE_LICENSE_IDS = frozenset({'EPL-1.0', 'EPL-2.0'})
+
+# Number of packages enriched concurrently
+ENRICH_WORKERS = 24
+
+# Shared HTTP session so deps.dev and Maven Central lookups reuse pooled keep-alive connections
+SESSION = make_session(pool_size=32)
+
+
+def _memoize_found(func):
+    """
+    Memoize the results of func for the process, except None.
+    
+    None means nothing was found or the request failed, which may be transient,
+    so those lookups are retried on the next call. Clear with func.cache_clear().
+    """
+    memo = {}
+    
+    @wraps(func)
+    def wrapper(*args):
+        try:
+            return memo[args]
+        except KeyError:
+            pass
+        result = func(*args)
+        if result is not None:
+            memo[args] = result
+        return result
+    
+    wrapper.cache_clear = memo.clear
+    return wrapper
+
+
+def get_maven_license_from_pom(package_name, version=None, cache_manager=None):
     """
     Try to get the real license from a Maven package's POM file.
     
+    Found POM licenses and latest versions are memoized for the process, so
+    parent POMs shared by many artifacts are fetched once. With a cache
+    manager, found licenses are also kept across runs.
+    
     Args:
         package_name: Maven package name (e.g., 'org.junit.platform:junit-platform-commons')
         version: Package version (optional, will use latest if not provided)
+        cache_manager: Optional SBOMCacheManager for persisting results
         
     Returns:
         License name from POM or None if not found
     """
+    if cache_manager is None:
+        return _get_maven_license_from_pom(package_name, version)
+    
+    if not version:
+        # The latest version moves, so it is only memoized for this run and never persisted
+        version = _get_latest_maven_version(package_name)
+        if not version:
+            return None
+    
+    pom_key = f"mavenpom:{package_name}:{version}"
+    cached = cache_manager.get_cached_package_info(pom_key)
+    if cached:
+        return cached.get('license')
+    
+    # Only found licenses are persisted, so failed lookups are retried on the next run
+    license_name = _get_maven_license_from_pom(package_name, version)
+    if license_name:
+        cache_manager.cache_package_info(pom_key, {'license': license_name})
+    return license_name
+
+
+@_memoize_found
+def _get_latest_maven_version(package_name):
+    """Return the latest version of a Maven package from Maven Central metadata, or None."""
+    try:
+        group_id, artifact_id = package_name.split(':')
+        group_path = group_id.replace('.', '/')
+        
+        metadata_url = MAVEN_METADATA_URL % (group_path, artifact_id)
+        metadata_resp = SESSION.get(metadata_url, timeout=10)
+        
+        if metadata_resp.status_code != 200:
+            logging.warning(f"Could not fetch metadata for {package_name}")
+            return None
+        
+        try:
+            root = ET.fromstring(metadata_resp.content)
+            latest_elem = root.find('.//latest')
+            if latest_elem is not None:
+                return latest_elem.text
+            # Fallback to last version in versions list
+            versions_elem = root.find('.//versions')
+            if versions_elem is not None:
+                version_elems = versions_elem.findall('version')
+                if version_elems:
+                    return version_elems[-1].text
+        except ET.ParseError:
+            logging.warning(f"Could not parse metadata XML for {package_name}")
+        return None
+    
+    except Exception as e:
+        logging.debug("Error getting latest version for %s: %s", package_name, e)
+        return None
+
+
+@_memoize_found
+def _get_maven_license_from_pom(package_name, version=None):
+    """Fetch the license name from a Maven package's POM, following parent POMs."""
     try:
         # Convert package name to path format
         group_id, artifact_id = package_name.split(':')
@@ -42,413 +156,634 @@ def get_maven_license_from_pom(package_name, version=None):
         
         # If no version provided, we need to find the latest
         if not version:
-            # Get the latest version from Maven Central metadata
-            metadata_url = f"https://repo1.maven.org/maven2/{group_path}/{artifact_id}/maven-metadata.xml"
-            metadata_resp = requests.get(metadata_url, timeout=10)
-            
-            if metadata_resp.status_code == 200:
-                try:
-                    root = ET.fromstring(metadata_resp.text)
-                    latest_elem = root.find('.//latest')
-                    if latest_elem is not None:
-                        version = latest_elem.text
-                    else:
-                        # Fallback to last version in versions list
-                        versions_elem = root.find('.//versions')
-                        if versions_elem is not None:
-                            version_elems = versions_elem.findall('version')
-                            if version_elems:
-                                version = version_elems[-1].text
-                except ET.ParseError:
-                    logging.warning(f"Could not parse metadata XML for {package_name}")
-                    return None
-            else:
-                logging.warning(f"Could not fetch metadata for {package_name}")
-                return None
+            version = _get_latest_maven_version(package_name)
         
         if not version:
             return None
         
         # Download the POM file
-        pom_url = f"https://repo1.maven.org/maven2/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
-        pom_resp = requests.get(pom_url, timeout=10)
+        pom_url = MAVEN_POM_URL % (group_path, artifact_id, version, artifact_id, version)
+        pom_resp = SESSION.get(pom_url, timeout=10)
         
         if pom_resp.status_code == 200:
             try:
-                root = ET.fromstring(pom_resp.text)
+                # Parse the raw bytes; the parser honours the XML encoding declaration
+                root = ET.fromstring(pom_resp.content)
                 
                 # Look for license information in the POM
-                # Handle XML namespaces - Maven POM might have default namespace
-                namespaces = {'m': 'http://maven.apache.org/POM/4.0.0'} if 'xmlns' in pom_resp.text else {}
-                
-                # Try with namespace first, then without
-                license_paths = [
-                    './/m:licenses/m:license/m:name',  # With namespace
-                    './/licenses/license/name'        # Without namespace
-                ]
-                
-                for path in license_paths:
-                    if namespaces:
-                        license_elem = root.find(path, namespaces)
-                    else:
-                        license_elem = root.find(path)
-                        
-                    if license_elem is not None and license_elem.text:
+                for license_elem in root.iterfind(POM_LICENSE_NAME_PATH):
+                    if license_elem.text:
                         license_name = license_elem.text.strip()
-                        logging.debug(f"Found license in POM for {package_name}:{version}: {license_name}")
+                        logging.debug("Found license in POM for %s:%s: %s", package_name, version, license_name)
                         return license_name
                 
                 # If no license found in direct elements, check parent POM
-                parent_elem = root.find('.//parent') if not namespaces else root.find('.//m:parent', namespaces)
+                parent_elem = root.find(POM_PARENT_PATH)
                 if parent_elem is not None:
-                    parent_group_id = None
-                    parent_artifact_id = None
-                    parent_version = None
-                    
-                    for child in parent_elem:
-                        tag = child.tag.split('}')[-1] if '}' in child.tag else child.tag  # Remove namespace
-                        if tag == 'groupId':
-                            parent_group_id = child.text
-                        elif tag == 'artifactId':
-                            parent_artifact_id = child.text
-                        elif tag == 'version':
-                            parent_version = child.text
+                    parent_group_id = parent_elem.findtext('{*}groupId')
+                    parent_artifact_id = parent_elem.findtext('{*}artifactId')
+                    parent_version = parent_elem.findtext('{*}version')
                     
                     if parent_group_id and parent_artifact_id and parent_version:
                         parent_package = f"{parent_group_id}:{parent_artifact_id}"
-                        logging.debug(f"Checking parent POM: {parent_package}:{parent_version}")
-                        return get_maven_license_from_pom(parent_package, parent_version)
+                        logging.debug("Checking parent POM: %s:%s", parent_package, parent_version)
+                        return _get_maven_license_from_pom(parent_package, parent_version)
                 
             except ET.ParseError as e:
                 logging.warning(f"Could not parse POM XML for {package_name}:{version}: {e}")
                 return None
         else:
-            logging.debug(f"Could not fetch POM for {package_name}:{version} (status: {pom_resp.status_code})")
+            logging.debug("Could not fetch POM for %s:%s (status: %s)", package_name, version, pom_resp.status_code)
             return None
             
     except Exception as e:
-        logging.debug(f"Error getting license from POM for {package_name}: {e}")
+        logging.debug("Error getting license from POM for %s: %s", package_name, e)
         return None
 
 
-def enrich_sbom_with_intelligent_resolution(input_sbom_path, output_sbom_path, cache_ttl_hours=168, resolve_licenses=True):
+def get_purl(pkg):
+    """Return the package URL from a package's externalRefs, or None if it has none."""
+    refs = pkg.get("externalRefs")
+    if not refs:
+        return None
+    for ref in refs:
+        if ref.get("referenceType") == "purl":
+            return ref.get("referenceLocator")
+    return None
+
+
+def _parse_maven_purl(purl_parts):
+    """Return (package_name, version) of a Maven purl in the group:artifact format deps.dev uses."""
+    if len(purl_parts) < 3:
+        return None
+    namespace = purl_parts[1] 
+    name_version = purl_parts[2]
+    name = name_version.split('@')[0]
+    package_name = f"{namespace}:{name}"
+    
+    # Get version if specified
+    version = None
+    if '@' in name_version:
+        version = name_version.split('@')[1]
+    return package_name, version
+
+
+def _parse_generic_purl(purl_parts):
+    """Return (package_name, version) of a purl, keeping a namespace as a name/ prefix."""
+    if len(purl_parts) >= 3:
+        package_name = f"{purl_parts[1]}/{purl_parts[2].split('@')[0]}"
+    else:
+        package_name = purl_parts[1].split('@')[0]
+    
+    version = None
+    if '@' in purl_parts[-1]:
+        version = purl_parts[-1].split('@')[1]
+    return package_name, version
+
+
+# Ecosystem-specific purl parsers; ecosystems without an entry use _parse_generic_purl
+PURL_PARSERS = {
+    'maven': _parse_maven_purl,
+}
+
+
+def get_skip_reason(pkg, purl):
     """
-    Enrich SBOM with license data and intelligent license resolution.
+    Classify packages that are not looked up on deps.dev.
     
     Args:
-        input_sbom_path: Path to input SBOM file
-        output_sbom_path: Path to output enriched SBOM file  
-        cache_ttl_hours: Cache TTL in hours
-        resolve_licenses: Whether to use intelligent license resolution
+        pkg: SBOM package dict
+        purl: The package's purl, or None if it has none
+        
+    Returns:
+        Tuple of (reason, entry) for the skipped packages summary, or None if
+        the package should be enriched
     """
+    if not purl:
+        return "no_purl", pkg.get('name', 'Unknown')
     
-    # Initialize components
-    github_token = os.getenv('GITHUB_TOKEN')
-    ai_api_key = os.getenv('GITHUB_TOKEN')  # Use same token for GitHub Models
+    # Skip internal and GitHub Actions packages
+    if 'github.com/actions' in purl:
+        return "github_actions", purl
+    if 'github.com' in purl:
+        return "internal", purl
+    return None
+
+
+@lru_cache(maxsize=8192)
+def parse_purl(purl):
+    """
+    Split a package URL into the parts used for deps.dev queries.
     
-    cache_manager = SBOMCacheManager(cache_ttl_hours=cache_ttl_hours, github_token=github_token)
-    license_resolver = LicenseResolver(api_key=ai_api_key, ai_provider='github') if resolve_licenses else None
+    Results are memoized, as SBOMs often list the same package for several subprojects.
     
-    cache_stats = cache_manager.get_cache_stats()
-    logging.info(f"Cache initialized: {cache_stats['valid_entries']} valid entries, {cache_stats['expired_entries']} expired")
+    Args:
+        purl: Package URL (e.g., 'pkg:maven/org.apache.commons/commons-lang3@3.12.0')
+        
+    Returns:
+        Tuple of (ecosystem, package_name, version) with version None if not
+        specified, or None if the package URL cannot be parsed
+    """
+    purl_parts = purl.split('/')
+    if len(purl_parts) < 2:
+        return None
+        
+    ecosystem = purl_parts[0].replace('pkg:', '')
+    parsed = PURL_PARSERS.get(ecosystem, _parse_generic_purl)(purl_parts)
+    if parsed is None:
+        return None
+    package_name, version = parsed
+    return ecosystem, package_name, version
+
+
+@lru_cache(maxsize=8192)
+def encode_package_name(package_name):
+    """Percent-encode a package name as a single deps.dev URL path segment, memoized per name."""
+    return quote(package_name, safe='')
+
+
+def depsdev_cache_key(ecosystem, package_name, version=None):
+    """Return the cache key under which a deps.dev lookup result is stored."""
+    cache_key = f"depsdev:{ecosystem}:{package_name}"
+    if version:
+        cache_key += f":{version}"
+    return cache_key
+
+
+def prefetch_depsdev_versions(version_keys):
+    """
+    Fetch deps.dev version data for many packages with the batch endpoint.
     
-    if resolve_licenses:
-        logging.info("✨ Intelligent license resolution enabled")
-    
-    with open(input_sbom_path, 'r') as f:
-        sbom = json.load(f)
-
-    enriched = 0
-    license_resolved = 0
-    skipped = 0
-    resolution_stats = {}
-    
-    skipped_packages = {
-        "internal": [],
-        "github_actions": [],
-        "not_found": [],
-        "no_purl": [],
-        "exception": []
-    }
-
-    # Handle SBOMs that have the package list nested under an "sbom" key
-    sbom_content = sbom.get("sbom", sbom)
-    packages_to_process = sbom_content.get("packages", []) or sbom_content.get("components", [])
-
-    for pkg in tqdm(packages_to_process, desc="Enriching SBOM with license resolution"):
-        # Extract purl from externalRefs
-        purl = None
-        for ref in pkg.get("externalRefs", []):
-            if ref.get("referenceType") == "purl":
-                purl = ref.get("referenceLocator")
-                break
-
-        if not purl:
-            skipped += 1
-            if pkg.get('name', 'Unknown') not in skipped_packages["no_purl"]:
-                skipped_packages["no_purl"].append(pkg.get('name', 'Unknown'))
-            continue
-
-        # Parse package URL for deps.dev query
+    Each POST covers up to DEPSDEV_BATCH_SIZE versions instead of one request
+    per package. Results are matched to packages by the version key deps.dev
+    echoes with each response. Versions missing from the result (unknown to
+    deps.dev, failed batches or pages) are left to the per-package request in
+    enrich_package().
+    
+    Args:
+        version_keys: Iterable of (ecosystem, package_name, version) tuples
+        
+    Returns:
+        Dict mapping (ecosystem, package_name, version) to the deps.dev version data
+    """
+    version_keys = list(dict.fromkeys(version_keys))
+    prefetched = {}
+    
+    for start in range(0, len(version_keys), DEPSDEV_BATCH_SIZE):
+        batch = version_keys[start:start + DEPSDEV_BATCH_SIZE]
+        requested = {
+            (ecosystem.upper(), name, version): (ecosystem, name, version)
+            for ecosystem, name, version in batch
+        }
+        body = {"requests": [
+            {"versionKey": {"system": system, "name": name, "version": version}}
+            for system, name, version in requested
+        ]}
+        
+        # Large results are paginated
+        responses = []
         try:
-            parsed_purl = urllib.parse.urlparse(purl)
-            
-            # Skip internal and GitHub Actions packages
-            if 'github.com' in purl and 'github.com/actions' not in purl:
-                skipped += 1
-                if purl not in skipped_packages["internal"]:
-                    skipped_packages["internal"].append(purl)
-                continue
-                    
-            if 'github.com/actions' in purl:
-                skipped += 1
-                if purl not in skipped_packages["github_actions"]:
-                    skipped_packages["github_actions"].append(purl)
-                continue
+            while True:
+                resp = SESSION.post(DEPSDEV_BATCH_URL, json=body, timeout=30)
+                if resp.status_code != 200:
+                    logging.warning(f"deps.dev batch request failed (status: {resp.status_code}), falling back to single requests")
+                    break
+                result = load_json(resp.content)
+                responses.extend(result.get('responses', []))
+                page_token = result.get('nextPageToken')
+                if not page_token:
+                    break
+                body['pageToken'] = page_token
+        except (requests.RequestException, ValueError) as e:
+            logging.warning(f"deps.dev batch request failed: {e}, falling back to single requests")
+        
+        for response in responses:
+            # Keyed by the echoed request rather than by position, so a dropped
+            # page or response cannot attach version data to the wrong package
+            version_key = (response.get('request') or {}).get('versionKey') or {}
+            key = requested.get((version_key.get('system'), version_key.get('name'), version_key.get('version')))
+            version_data = response.get('version')
+            if key and version_data:
+                prefetched[key] = version_data
+    
+    logging.debug("Prefetched %s of %s versions from deps.dev", len(prefetched), len(version_keys))
+    return prefetched
 
-            # Parse PURL components
-            purl_parts = purl.split('/')
-            if len(purl_parts) < 2:
-                continue
-                
-            ecosystem = purl_parts[0].replace('pkg:', '')
-            
-            # Handle Maven packages specially (use : format for deps.dev)
-            if ecosystem == 'maven':
-                if len(purl_parts) < 3:
-                    continue
-                namespace = purl_parts[1] 
-                name_version = purl_parts[2]
-                name = name_version.split('@')[0]
-                package_name = f"{namespace}:{name}"
-                
-                # Get version if specified
-                version = None
-                if '@' in name_version:
-                    version = name_version.split('@')[1]
-            else:
-                # Other ecosystems 
-                if len(purl_parts) >= 3:
-                    package_name = f"{purl_parts[1]}/{purl_parts[2].split('@')[0]}"
-                else:
-                    package_name = purl_parts[1].split('@')[0]
-                
-                version = None
-                if '@' in purl_parts[-1]:
-                    version = purl_parts[-1].split('@')[1]
+
+def has_detailed_eclipse_license(licenses):
+    """
+    Check whether deps.dev already reported an Eclipse license for a package.
+    
+    deps.dev marks some Eclipse-licensed Maven packages as "non-standard" next to
+    the detailed license; those need no POM lookup.
+    
+    Args:
+        licenses: License names reported by deps.dev
+        
+    Returns:
+        True if an EPL SPDX ID or an Eclipse Public License name is among them
+    """
+    return not ECLIPSE_LICENSE_IDS.isdisjoint(licenses) or any("Eclipse Public License" in lic for lic in licenses)
+
+
+def licenses_from_version_data(version_data, package_name):
+    """
+    Extract the license names from a deps.dev version response.
+    
+    Detailed license information is preferred over the plain license list when present.
+    
+    Args:
+        version_data: deps.dev version data
+        package_name: Package name, for logging
+        
+    Returns:
+        List of license names
+    """
+    license_data = version_data.get('licenses', [])
+    
+    # Check for detailed license information
+    license_details = version_data.get('licenseDetails', [])
+    if license_details:
+        # Use detailed license information if available
+        detailed_licenses = []
+        for detail in license_details:
+            license_name = detail.get('license')
+            if license_name:
+                detailed_licenses.append(license_name)
+                logging.debug("Found detailed license: %s (SPDX: %s)", license_name, detail.get('spdx'))
+        
+        if detailed_licenses:
+            license_data = detailed_licenses
+            logging.debug("🔍 Using detailed license info from deps.dev for %s: %s", package_name, detailed_licenses)
+    
+    return license_data
+
+
+def _get_depsdev_version_licenses(cache_manager, prefetched, ecosystem, package_name, encoded_package, version):
+    """
+    Return the licenses of a package version that a version-less lookup resolved to.
+    
+    The version is often in the SBOM as well, so a cached or prefetched result
+    for it is reused before falling back to another request. Fetched results
+    are cached under the version's own key for later lookups.
+    
+    Returns:
+        List of license names, or None if the version could not be fetched
+    """
+    version_key = depsdev_cache_key(ecosystem, package_name, version)
+    cached_result = cache_manager.get_cached_package_info(version_key)
+    if cached_result:
+        return cached_result.get('license_data')
+    
+    version_data = prefetched.get((ecosystem, package_name, version)) if prefetched else None
+    if version_data is None:
+        version_url = DEPSDEV_VERSION_URL % (ecosystem, encoded_package, version)
+        version_response = SESSION.get(version_url, timeout=10)
+        if version_response.status_code != 200:
+            return None
+        version_data = load_json(version_response.content)
+    
+    license_data = licenses_from_version_data(version_data, package_name)
+    cache_manager.cache_package_info(version_key, {
+        'license_data': license_data,
+        'source': 'deps.dev'
+    })
+    return license_data
+
+
+def enrich_package(pkg, cache_manager, license_resolver, resolve_licenses, prefetched=None):
+    """
+    Enrich a single SBOM package with license data, updating it in place.
+    
+    Safe to run concurrently for different packages: aggregate counters are
+    left to the caller, which merges the returned outcome.
+    
+    Args:
+        pkg: SBOM package dict
+        cache_manager: SBOMCacheManager used for deps.dev results
+        license_resolver: LicenseResolver, or None if resolution is disabled
+        resolve_licenses: Whether to use intelligent license resolution
+        prefetched: Optional deps.dev version data by (ecosystem, package_name, version),
+            as returned by prefetch_depsdev_versions()
+        
+    Returns:
+        Tuple of (enriched, skip, methods): whether a license was concluded, the
+        (reason, entry) for the skipped packages summary or None, and the
+        resolution method of every license that was resolved
+    """
+    methods = []
+    
+    purl = get_purl(pkg)
+    skip = get_skip_reason(pkg, purl)
+    if skip:
+        return False, skip, methods
+
+    # Parse package URL for deps.dev query
+    try:
+        # Parse PURL components
+        parsed = parse_purl(purl)
+        if parsed is None:
+            return False, None, methods
+        ecosystem, package_name, version = parsed
+        
+        # Check cache first
+        cache_key = depsdev_cache_key(ecosystem, package_name, version)
+        cached_result = cache_manager.get_cached_package_info(cache_key)
+        
+        if cached_result:
+            license_data = cached_result.get('license_data')
+            logging.debug("CACHE HIT: %s", package_name)
+        else:
+            # Query deps.dev API with correct format
+            encoded_package = encode_package_name(package_name)
             
-            # Check cache first
-            cache_key = f"depsdev:{ecosystem}:{package_name}"
             if version:
-                cache_key += f":{version}"
-                
-            cached_result = cache_manager.get_cached_package_info(cache_key)
+                # Get specific version
+                url = DEPSDEV_VERSION_URL % (ecosystem, encoded_package, version)
+            else:
+                # Get package info (latest versions)  
+                url = DEPSDEV_PACKAGE_URL % (ecosystem, encoded_package)
             
-            if cached_result:
-                license_data = cached_result.get('license_data')
-                logging.debug(f"CACHE HIT: {package_name}")
+            # Versions fetched by the batch prefetch need no request of their own
+            data = prefetched.get((ecosystem, package_name, version)) if version and prefetched else None
+            if data is not None:
+                status_code = 200
             else:
-                # Query deps.dev API with correct format
-                encoded_package = quote(package_name, safe='')
+                response = SESSION.get(url, timeout=10)
+                status_code = response.status_code
+            license_data = None
+            
+            if status_code == 200:
+                if data is None:
+                    data = load_json(response.content)
                 
                 if version:
-                    # Get specific version
-                    url = f"https://api.deps.dev/v3alpha/systems/{ecosystem}/packages/{encoded_package}/versions/{version}"
+                    # Direct version response
+                    license_data = licenses_from_version_data(data, package_name)
                 else:
-                    # Get package info (latest versions)  
-                    url = f"https://api.deps.dev/v3alpha/systems/{ecosystem}/packages/{encoded_package}"
+                    # Package response - get from latest version
+                    versions = data.get('versions', [])
+                    if versions:
+                        # Try to get license from the first (usually latest) version
+                        latest_version_info = versions[0]
+                        version_to_fetch = latest_version_info.get('versionKey', {}).get('version')
+                        
+                        if version_to_fetch:
+                            license_data = _get_depsdev_version_licenses(
+                                cache_manager, prefetched, ecosystem, package_name, encoded_package, version_to_fetch
+                            )
                 
-                response = requests.get(url, timeout=10)
-                license_data = None
+                # Cache the result
+                cache_manager.cache_package_info(cache_key, {
+                    'license_data': license_data,
+                    'source': 'deps.dev'
+                })
+                logging.debug("API CALL: %s -> %s", package_name, status_code)
+            else:
+                logging.debug("API ERROR: %s -> %s", package_name, status_code)
+                # Cache empty result to avoid repeated failures
+                cache_manager.cache_package_info(cache_key, {
+                    'license_data': None,
+                    'source': 'deps.dev_error'
+                })
+
+        # Process license information
+        if license_data:
+            licenses = []
+            raw_license_names = []
+            
+            for lic in license_data:
+                if isinstance(lic, str):
+                    licenses.append(lic)
+                    raw_license_names.append(lic)
+                elif isinstance(lic, dict):
+                    license_name = lic.get('license') or lic.get('name')
+                    if license_name:
+                        licenses.append(license_name)
+                        raw_license_names.append(license_name)
+
+            # Apply intelligent license resolution if enabled
+            resolved_licenses = []
+            if resolve_licenses and license_resolver:
+                candidates = []
+                # Only use POM fallback if deps.dev didn't already provide the detailed license
+                pom_fallback = ecosystem == "maven" and "non-standard" in licenses and not has_detailed_eclipse_license(licenses)
+                for orig_license in licenses:
+                    # Special handling for "non-standard" - try Maven POM fallback only if deps.dev didn't provide details
+                    if orig_license == "non-standard" and pom_fallback:
+                        real_license = get_maven_license_from_pom(package_name, version, cache_manager)
+                        if real_license:
+                            logging.info("🔍 Found real license in POM for %s: %s", package_name, real_license)
+                            orig_license = real_license
+                    candidates.append(orig_license)
+                
+                # Resolve all of the package's licenses together, concurrently
+                resolutions = license_resolver.resolve_licenses(candidates)
+                resolution_records = []
                 
-                if response.status_code == 200:
-                    data = response.json()
+                for orig_license in candidates:
+                    resolution_result = resolutions[orig_license]
                     
-                    if version:
-                        # Direct version response
-                        license_data = data.get('licenses', [])
+                    if resolution_result['resolved']:
+                        resolved_licenses.append(resolution_result['resolved'])
                         
-                        # Check for detailed license information
-                        license_details = data.get('licenseDetails', [])
-                        if license_details:
-                            # Use detailed license information if available
-                            detailed_licenses = []
-                            for detail in license_details:
-                                license_name = detail.get('license')
-                                if license_name:
-                                    detailed_licenses.append(license_name)
-                                    logging.debug(f"Found detailed license: {license_name} (SPDX: {detail.get('spdx')})")
-                            
-                            if detailed_licenses:
-                                license_data = detailed_licenses
-                                logging.debug(f"🔍 Using detailed license info from deps.dev for {package_name}: {detailed_licenses}")
+                        # Track resolution statistics
+                        method = resolution_result['method']
+                        methods.append(method)
+                        
+                        logging.debug("🎯 RESOLVED: '%s' → '%s' (%s)", orig_license, resolution_result['resolved'], method)
+                        
+                        resolution_records.append({
+                            'original': orig_license,
+                            'resolved': resolution_result['resolved'],
+                            'method': resolution_result['method'],
+                            'confidence': resolution_result['confidence']
+                        })
                     else:
-                        # Package response - get from latest version
-                        versions = data.get('versions', [])
-                        if versions:
-                            # Try to get license from the first (usually latest) version
-                            latest_version_info = versions[0]
-                            version_to_fetch = latest_version_info.get('versionKey', {}).get('version')
-                            
-                            if version_to_fetch:
-                                version_url = f"https://api.deps.dev/v3alpha/systems/{ecosystem}/packages/{encoded_package}/versions/{version_to_fetch}"
-                                version_response = requests.get(version_url, timeout=10)
-                                
-                                if version_response.status_code == 200:
-                                    version_data = version_response.json()
-                                    license_data = version_data.get('licenses', [])
-                                    
-                                    # Check for detailed license information
-                                    license_details = version_data.get('licenseDetails', [])
-                                    if license_details:
-                                        detailed_licenses = []
-                                        for detail in license_details:
-                                            license_name = detail.get('license')
-                                            if license_name:
-                                                detailed_licenses.append(license_name)
-                                                logging.debug(f"Found detailed license: {license_name}")
-                                        
-                                        if detailed_licenses:
-                                            license_data = detailed_licenses
-                                            logging.debug(f"🔍 Using detailed license info from deps.dev for {package_name}: {detailed_licenses}")
-                    
-                    # Cache the result
-                    cache_manager.cache_package_info(cache_key, {
-                        'license_data': license_data,
-                        'source': 'deps.dev'
-                    })
-                    logging.debug(f"API CALL: {package_name} -> {response.status_code}")
-                else:
-                    logging.debug(f"API ERROR: {package_name} -> {response.status_code}")
-                    # Cache empty result to avoid repeated failures
-                    cache_manager.cache_package_info(cache_key, {
-                        'license_data': None,
-                        'source': 'deps.dev_error'
-                    })
+                        resolved_licenses.append(orig_license)  # Keep original if can't resolve
+                
+                # Add resolution metadata to the package in one step
+                if resolution_records:
+                    pkg.setdefault('enrichment', {}).setdefault('licenseResolutions', []).extend(resolution_records)
+            else:
+                resolved_licenses = licenses
 
-            # Process license information
-            if license_data:
-                licenses = []
-                raw_license_names = []
+            # Set the concluded license
+            if resolved_licenses:
+                # Interned, as the same few licenses recur across thousands of packages
+                if len(resolved_licenses) == 1:
+                    pkg["licenseConcluded"] = sys.intern(resolved_licenses[0])
+                else:
+                    # Multiple licenses - create SPDX expression
+                    pkg["licenseConcluded"] = sys.intern(" AND ".join(resolved_licenses))
                 
-                for lic in license_data:
-                    if isinstance(lic, str):
-                        licenses.append(lic)
-                        raw_license_names.append(lic)
-                    elif isinstance(lic, dict):
-                        license_name = lic.get('license') or lic.get('name')
-                        if license_name:
-                            licenses.append(license_name)
-                            raw_license_names.append(license_name)
-
-                # Apply intelligent license resolution if enabled
-                resolved_licenses = []
-                if resolve_licenses and license_resolver:
-                    for orig_license in licenses:
-                        # Special handling for "non-standard" - try Maven POM fallback only if deps.dev didn't provide details
-                        if orig_license == "non-standard" and ecosystem == "maven":
-                            # Only use POM fallback if deps.dev didn't already provide the detailed license
-                            if not any("Eclipse Public License" in str(lic) for lic in licenses):
-                                real_license = get_maven_license_from_pom(package_name, version)
-                                if real_license:
-                                    logging.info(f"🔍 Found real license in POM for {package_name}: {real_license}")
-                                    orig_license = real_license
-                        
-                        resolution_result = license_resolver.resolve_license(orig_license)
-                        
+                logging.debug("ENRICHED: %s -> %s", package_name, pkg['licenseConcluded'])
+                return True, None, methods
+            else:
+                logging.warning("NO LICENSE FOUND: %s -> UNKNOWN", package_name)
+                return False, ("not_found", purl), methods
+        else:
+            # deps.dev returned no license data - try Maven POM fallback (Issue #19)
+            if ecosystem == "maven" and resolve_licenses:
+                logging.info("🔍 deps.dev returned no license for Maven package %s, trying POM fallback...", package_name)
+                real_license = get_maven_license_from_pom(package_name, version, cache_manager)
+                if real_license:
+                    logging.info("🔍 Found license in POM for %s: %s", package_name, real_license)
+                    resolved_license = real_license
+                    if license_resolver:
+                        resolution_result = license_resolver.resolve_license(real_license)
                         if resolution_result['resolved']:
-                            resolved_licenses.append(resolution_result['resolved'])
-                            license_resolved += 1
-                            
-                            # Track resolution statistics
+                            resolved_license = resolution_result['resolved']
                             method = resolution_result['method']
-                            resolution_stats[method] = resolution_stats.get(method, 0) + 1
-                            
-                            logging.debug(f"🎯 RESOLVED: '{orig_license}' → '{resolution_result['resolved']}' ({method})")
-                            
-                            # Add resolution metadata to package
+                            methods.append(method)
+                            logging.debug("🎯 RESOLVED (POM fallback): '%s' → '%s' (%s)", real_license, resolved_license, method)
                             if 'enrichment' not in pkg:
                                 pkg['enrichment'] = {}
-                            if 'licenseResolutions' not in pkg['enrichment']:
-                                pkg['enrichment']['licenseResolutions'] = []
-                                
-                            pkg['enrichment']['licenseResolutions'].append({
-                                'original': orig_license,
-                                'resolved': resolution_result['resolved'],
-                                'method': resolution_result['method'],
-                                'confidence': resolution_result['confidence']
-                            })
-                        else:
-                            resolved_licenses.append(orig_license)  # Keep original if can't resolve
+                            pkg['enrichment']['licenseResolutions'] = [{
+                                'original': real_license,
+                                'resolved': resolved_license,
+                                'method': method,
+                                'confidence': resolution_result['confidence'],
+                                'source': 'maven_pom_fallback'
+                            }]
+                    pkg["licenseConcluded"] = sys.intern(resolved_license)
+                    # Cache the POM result for future runs
+                    cache_manager.cache_package_info(cache_key, {
+                        'license_data': [resolved_license],
+                        'source': 'maven_pom_fallback'
+                    })
+                    return True, None, methods
                 else:
-                    resolved_licenses = licenses
+                    logging.warning("NO LICENSE FOUND: %s -> UNKNOWN (POM fallback also failed)", package_name)
+                    return False, ("not_found", purl), methods
+            else:
+                logging.warning("NO LICENSE FOUND: %s -> UNKNOWN", package_name)
+                return False, ("not_found", purl), methods
 
-                # Set the concluded license
-                if resolved_licenses:
-                    if len(resolved_licenses) == 1:
-                        pkg["licenseConcluded"] = resolved_licenses[0]
-                    else:
-                        # Multiple licenses - create SPDX expression
-                        pkg["licenseConcluded"] = " AND ".join(resolved_licenses)
-                    
-                    logging.debug(f"ENRICHED: {package_name} -> {pkg['licenseConcluded']}")
-                    enriched += 1
-                else:
-                    logging.warning(f"NO LICENSE FOUND: {package_name} -> UNKNOWN")
-                    skipped += 1
-                    if purl not in skipped_packages["not_found"]:
-                        skipped_packages["not_found"].append(purl)
+    except Exception as e:
+        logging.warning("Exception processing %s: %s", purl, e)
+        return False, ("exception", purl), methods
+
+
+def enrich_sbom_with_intelligent_resolution(input_sbom_path, output_sbom_path, cache_ttl_hours=168, resolve_licenses=True,
+                                            compact=False):
+    """
+    Enrich SBOM with license data and intelligent license resolution.
+    
+    Args:
+        input_sbom_path: Path to input SBOM file
+        output_sbom_path: Path to output enriched SBOM file  
+        cache_ttl_hours: Cache TTL in hours
+        resolve_licenses: Whether to use intelligent license resolution
+        compact: Write the output SBOM without indentation
+    """
+    
+    # Initialize components
+    github_token = os.getenv('GITHUB_TOKEN')
+    ai_api_key = os.getenv('GITHUB_TOKEN')  # Use same token for GitHub Models
+    
+    cache_manager = SBOMCacheManager.shared(cache_ttl_hours=cache_ttl_hours, github_token=github_token)
+    license_resolver = LicenseResolver(api_key=ai_api_key, ai_provider='github') if resolve_licenses else None
+    
+    cache_stats = cache_manager.get_cache_stats()
+    logging.info(f"Cache initialized: {cache_stats['valid_entries']} valid entries, {cache_stats['expired_entries']} expired")
+    
+    # Remove expired cache entries in the background while packages are enriched;
+    # the executor is shut down (waiting for the cleanup) even if enrichment fails
+    with ThreadPoolExecutor(max_workers=1) as cleanup_executor:
+        cleanup_future = cleanup_executor.submit(cache_manager.cleanup_expired_cache)
+        
+        if resolve_licenses:
+            logging.info("✨ Intelligent license resolution enabled")
+        
+        with open(input_sbom_path, 'rb') as f:
+            sbom = load_json(f.read())
+
+        enriched = 0
+        license_resolved = 0
+        skipped = 0
+        resolution_stats = {}
+        
+        skipped_packages = {
+            "internal": set(),
+            "github_actions": set(),
+            "not_found": set(),
+            "no_purl": set(),
+            "exception": set()
+        }
+
+        # Handle SBOMs that have the package list nested under an "sbom" key
+        sbom_content = sbom.get("sbom", sbom)
+        packages_to_process = sbom_content.get("packages", []) or sbom_content.get("components", [])
+
+        # Packages sharing a purl get the same result. One package per purl is enriched
+        # first, so the duplicates are then served from the cache instead of racing to
+        # fetch the same data concurrently.
+        unique_packages = {}  # purl -> first package with that purl
+        duplicate_packages = []
+        for pkg in packages_to_process:
+            purl = get_purl(pkg)
+            
+            # Packages without a deps.dev lookup are classified here and never reach the pool
+            skip = get_skip_reason(pkg, purl)
+            if skip:
+                skipped += 1
+                reason, entry = skip
+                skipped_packages[reason].add(entry)
+                continue
+            
+            if purl in unique_packages:
+                duplicate_packages.append(pkg)
             else:
-                # deps.dev returned no license data - try Maven POM fallback (Issue #19)
-                if ecosystem == "maven" and resolve_licenses:
-                    logging.info(f"🔍 deps.dev returned no license for Maven package {package_name}, trying POM fallback...")
-                    real_license = get_maven_license_from_pom(package_name, version)
-                    if real_license:
-                        logging.info(f"🔍 Found license in POM for {package_name}: {real_license}")
-                        resolved_license = real_license
-                        if license_resolver:
-                            resolution_result = license_resolver.resolve_license(real_license)
-                            if resolution_result['resolved']:
-                                resolved_license = resolution_result['resolved']
-                                license_resolved += 1
-                                method = resolution_result['method']
-                                resolution_stats[method] = resolution_stats.get(method, 0) + 1
-                                logging.debug(f"🎯 RESOLVED (POM fallback): '{real_license}' → '{resolved_license}' ({method})")
-                                if 'enrichment' not in pkg:
-                                    pkg['enrichment'] = {}
-                                pkg['enrichment']['licenseResolutions'] = [{
-                                    'original': real_license,
-                                    'resolved': resolved_license,
-                                    'method': method,
-                                    'confidence': resolution_result['confidence'],
-                                    'source': 'maven_pom_fallback'
-                                }]
-                        pkg["licenseConcluded"] = resolved_license
-                        enriched += 1
-                        # Cache the POM result for future runs
-                        cache_manager.cache_package_info(cache_key, {
-                            'license_data': [resolved_license],
-                            'source': 'maven_pom_fallback'
-                        })
-                    else:
-                        logging.warning(f"NO LICENSE FOUND: {package_name} -> UNKNOWN (POM fallback also failed)")
-                        skipped += 1
-                        if purl not in skipped_packages["not_found"]:
-                            skipped_packages["not_found"].append(purl)
-                else:
-                    logging.warning(f"NO LICENSE FOUND: {package_name} -> UNKNOWN")
-                    skipped += 1
-                    if purl not in skipped_packages["not_found"]:
-                        skipped_packages["not_found"].append(purl)
+                unique_packages[purl] = pkg
+
+        # Fetch uncached versioned packages from deps.dev in batches up front
+        version_keys = []
+        for purl in unique_packages:
+            parsed = parse_purl(purl)
+            if parsed is None or not parsed[2] or parsed[0] not in DEPSDEV_BATCH_SYSTEMS:
+                continue
+            if cache_manager.get_cached_package_info(depsdev_cache_key(*parsed)) is None:
+                version_keys.append(parsed)
+        prefetched = prefetch_depsdev_versions(version_keys) if version_keys else {}
+
+        # Resolve the prefetched license names together, so names left for the AI
+        # fallback are sent in batched requests across packages instead of one by one
+        if resolve_licenses and license_resolver and prefetched:
+            license_names = {
+                license_name
+                for (ecosystem, package_name, version), version_data in prefetched.items()
+                for license_name in licenses_from_version_data(version_data, package_name)
+                if isinstance(license_name, str) and license_name != "non-standard"
+            }
+            license_resolver.resolve_licenses(sorted(license_names))
 
-        except Exception as e:
-            skipped += 1
-            logging.warning(f"Exception processing {purl}: {e}")
-            if purl not in skipped_packages["exception"]:
-                skipped_packages["exception"].append(purl)
+        def enrich(pkg):
+            return enrich_package(pkg, cache_manager, license_resolver, resolve_licenses, prefetched)
 
-    # Cleanup expired cache entries
-    cleaned_entries = cache_manager.cleanup_expired_cache()
+        # Packages are independent and lookups are I/O-bound, so they are enriched concurrently
+        with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
+            def outcomes():
+                yield from executor.map(enrich, unique_packages.values())
+                # Submitted only once all unique packages are done
+                yield from executor.map(enrich, duplicate_packages)
+            
+            for was_enriched, skip, methods in tqdm(outcomes(), total=len(unique_packages) + len(duplicate_packages),
+                                                    desc="Enriching SBOM with license resolution", mininterval=0.5):
+                if was_enriched:
+                    enriched += 1
+                if skip:
+                    skipped += 1
+                    reason, entry = skip
+                    skipped_packages[reason].add(entry)
+                license_resolved += len(methods)
+                for method in methods:
+                    resolution_stats[method] = resolution_stats.get(method, 0) + 1
+
+        # Commit queued organizational cache entries and wait for the expired cache cleanup
+        cache_manager.flush_org_cache()
+        cleaned_entries = cleanup_future.result()
+    
     final_cache_stats = cache_manager.get_cache_stats()
     
     # Print results
@@ -467,14 +802,16 @@ def enrich_sbom_with_intelligent_resolution(input_sbom_path, output_sbom_path, c
     for reason, pkgs in skipped_packages.items():
         if pkgs:
             print(f"\n{reason.replace('_', ' ').title()} ({len(pkgs)}):")
-            for p in pkgs[:10]:  # Show first 10 to avoid too much output
+            for p in sorted(pkgs)[:10]:  # Show first 10 to avoid too much output
                 print(f"  - {p}")
             if len(pkgs) > 10:
                 print(f"  ... and {len(pkgs) - 10} more")
     print("\n------------------------------")
 
-    with open(output_sbom_path, 'w') as f:
-        json.dump(sbom, f, indent=2)
+    # Serialize in one call and write the result at once, rather than streaming
+    # thousands of small fragments through json.dump
+    with open(output_sbom_path, 'wb') as f:
+        f.write(dump_json(sbom, compact))
     print(f"💾 Output written to {output_sbom_path}")
 
 
@@ -498,6 +835,10 @@ if __name__ == "__main__":
                         help="Enable intelligent license resolution (default: enabled)")
     parser.add_argument("--no-resolve-licenses", dest="resolve_licenses", action="store_false",
                         help="Disable intelligent license resolution")
+    parser.add_argument("--compact", action="store_true", default=os.getenv("CI") == "true",
+                        help="Write the output SBOM without indentation (default: enabled when CI=true)")
+    parser.add_argument("--no-compact", dest="compact", action="store_false",
+                        help="Write the output SBOM indented")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     args = parser.parse_args()
 
@@ -506,5 +847,5 @@ if __name__ == "__main__":
     logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
 
     enrich_sbom_with_intelligent_resolution(
-        args.input, args.output, args.cache_ttl_hours, args.resolve_licenses
+        args.input, args.output, args.cache_ttl_hours, args.resolve_licenses, args.compact
     )
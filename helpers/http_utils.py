@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Otto GmbH & Co KG
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Shared HTTP session and JSON helpers for the SBOM helper scripts.
+"""
+
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup; the standard library json module is used without it
+    orjson = None
+
+# Responses retried with backoff: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+USER_AGENT = 'sbom-auditor-action'
+
+
+def make_session(pool_size=10, headers=None):
+    """
+    Create a keep-alive HTTP session with the shared retry policy.
+    
+    Idempotent requests are retried up to three times with backoff. After the
+    last retry the final response is returned, so callers keep checking the
+    status code themselves.
+    
+    Args:
+        pool_size: Connections kept per host, at least the number of threads using the session
+        headers: Optional headers sent with every request, in addition to the User-Agent
+    
+    Returns:
+        requests.Session mounted for https://
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=RETRY_STATUSES, raise_on_status=False)
+    ))
+    session.headers['User-Agent'] = USER_AGENT
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def load_json(data):
+    """Parse a JSON document from bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json(obj, compact=False):
+    """Serialize an object to JSON bytes (indented unless compact), using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE if compact else orjson.OPT_INDENT_2)
+    if compact:
+        return (json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8')
+    return json.dumps(obj, indent=2).encode('utf-8')
@@ -10,6 +10,7 @@ Tests the complete pipeline for resolving "non-standard" licenses from Maven pac
 import json
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
 from enrich_sbom import enrich_sbom_with_intelligent_resolution
 
 
@@ -151,18 +152,22 @@ def test_direct_license_extraction():
     ]
     
     from enrich_sbom import get_maven_license_from_pom
+    from license_resolver import LicenseResolver
     
-    for package_name, version in test_packages:
+    # POM lookups are network-bound, so all packages are fetched concurrently
+    with ThreadPoolExecutor(max_workers=len(test_packages)) as executor:
+        license_names = list(executor.map(lambda p: get_maven_license_from_pom(*p), test_packages))
+    
+    # One resolver for all packages so the SPDX license list is fetched only once
+    resolver = LicenseResolver()
+    
+    for (package_name, version), license_name in zip(test_packages, license_names):
         print(f"📦 Testing {package_name}:{version}")
         
-        license_name = get_maven_license_from_pom(package_name, version)
-        
         if license_name:
             print(f"   ✅ License: {license_name}")
             
             # Test resolution
-            from license_resolver import LicenseResolver
-            resolver = LicenseResolver()
             result = resolver.resolve_license(license_name)
             
             if result['resolved']:
@@ -10,17 +10,291 @@ Resolves non-standard license names to SPDX identifiers using:
 """
 
 import requests
-import json
+import os
 import re
+import time
 import logging
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from typing import Optional, Dict, List, Tuple
 from difflib import SequenceMatcher
 from functools import lru_cache
+from operator import itemgetter
+from pathlib import Path
+from http_utils import make_session, load_json
+
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:
+    # Optional speedup; candidates are only prefiltered with quick_ratio() without it
+    Indel = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of license names resolved concurrently by resolve_licenses()
+RESOLVE_WORKERS = 8
+
+# Maximum number of license names resolved by a single batched AI request
+AI_BATCH_SIZE = 50
+
+# One answer line of a batched AI response: '<number>. <SPDX ID>'
+AI_BATCH_ANSWER = re.compile(r'^\s*(\d+)[.):]\s*"?([^\s"]+)"?\s*$')
+
+# Attempts at a batched AI request while the provider is rate limited or unreachable,
+# and the delay before the first retry (doubled for every further retry)
+AI_BATCH_ATTEMPTS = 3
+AI_RETRY_DELAY_SECONDS = 2.0
+
+# Exceptions of the openai package that mean the provider is rate limited or unreachable
+OPENAI_UNAVAILABLE_ERRORS = frozenset({'RateLimitError', 'APIConnectionError', 'APITimeoutError'})
+
+# Connections kept per host by SESSION; resolution runs from resolve_licenses()'s workers
+# and from callers' own thread pools (enrich_sbom uses 24 workers), so this covers both
+SESSION_POOL_SIZE = 32
+
+# Shared HTTP session so SPDX list fetches and AI requests reuse pooled keep-alive connections
+SESSION = make_session(pool_size=SESSION_POOL_SIZE)
+
+# SPDX license list data files, persisted on disk between runs
+SPDX_LICENSES_URL = 'https://raw.githubusercontent.com/spdx/license-list-data/main/json/licenses.json'
+SPDX_EXCEPTIONS_URL = 'https://raw.githubusercontent.com/spdx/license-list-data/main/json/exceptions.json'
+SPDX_LIST_CACHE_DIR = Path(os.environ.get('SBOM_LICENSE_CACHE') or Path.home() / '.cache' / 'sbom_auditor' / 'spdx')
+
+# Persisted SPDX lists younger than this are used without asking the server
+SPDX_LIST_MAX_AGE_SECONDS = 24 * 3600
+
+# Special patterns for common license names, compiled once and tried in order
+SPDX_NAME_PATTERNS = [(re.compile(pattern), spdx_id) for pattern, spdx_id in (
+    (r'apache.*software.*license.*v?\.?2\.?0?', 'Apache-2.0'),
+    (r'apache.*license.*v?\.?2\.?0?', 'Apache-2.0'),
+    (r'bsd.*3.*clause', 'BSD-3-Clause'),
+    (r'bsd.*3', 'BSD-3-Clause'),
+    (r'mit.*license', 'MIT'),
+    (r'eclipse.*public.*license.*v?\.?2\.?0?', 'EPL-2.0'),
+    (r'eclipse.*public.*license.*v?\.?1\.?0?', 'EPL-1.0'),
+    (r'mozilla.*public.*license.*v?\.?2\.?0?', 'MPL-2.0'),
+    (r'gnu.*general.*public.*license.*v?\.?3', 'GPL-3.0-only'),
+    (r'gnu.*general.*public.*license.*v?\.?2', 'GPL-2.0-only'),
+    (r'lgpl.*v?\.?3', 'LGPL-3.0-only'),
+    (r'lgpl.*v?\.?2\.?1', 'LGPL-2.1-only'),
+)]
+
+# Substitutions applied by _normalize_license_name(), compiled once
+NORMALIZE_WHITESPACE = re.compile(r'\s+')
+NORMALIZE_THE_PREFIX = re.compile(r'^(the\s+)')
+NORMALIZE_LICENSE_SUFFIX = re.compile(r'\s+(license|licence)(\s*$)')
+NORMALIZE_V_PREFIX = re.compile(r'\s*v\.?\s*')
+NORMALIZE_VERSION_WORD = re.compile(r'\s*version\s+')
+NORMALIZE_PUNCTUATION = re.compile(r'[,\(\)]')
+
+# Leading keyword of every name pattern in one alternation: a single search rules out
+# all patterns for names that contain none of them
+SPDX_NAME_KEYWORDS = re.compile('|'.join(
+    dict.fromkeys(re.match(r'[a-z]+', pattern.pattern).group() for pattern, _ in SPDX_NAME_PATTERNS)
+))
+
+
+# Per-thread SequenceMatchers keyed by their second sequence, see _matcher_for()
+_thread_matchers = threading.local()
+
+
+def _matcher_for(b: str) -> SequenceMatcher:
+    """
+    Return this thread's SequenceMatcher whose second sequence is b.
+    
+    SequenceMatcher caches its analysis of the second sequence (b2j and the
+    character counts behind quick_ratio()), so keeping one matcher per SPDX
+    target lets each query only swap in the first sequence. Matchers are
+    mutated by set_seq1(), hence one set per thread.
+    """
+    matchers = getattr(_thread_matchers, 'by_target', None)
+    if matchers is None:
+        matchers = _thread_matchers.by_target = {}
+    matcher = matchers.get(b)
+    if matcher is None:
+        matcher = matchers[b] = SequenceMatcher(None, '', b)
+    return matcher
+
+
+def _bounded_ratio(a: str, b: str, threshold: float) -> float:
+    """
+    Return the SequenceMatcher similarity of two strings, or 0.0 if it cannot reach threshold.
+    
+    Candidates whose lengths alone rule out the threshold are rejected first.
+    quick_ratio() is an upper bound on ratio() that only counts shared characters,
+    so most other candidates are rejected without computing the matching blocks. When
+    rapidfuzz is installed, its C++ Indel similarity (2 * LCS / total length) is
+    checked first: SequenceMatcher's matching blocks form a common subsequence, so
+    it is a tighter upper bound, and the scores themselves stay unchanged.
+    """
+    # The small tolerance keeps float rounding from rejecting a candidate at exactly the threshold
+    threshold -= 1e-9
+    # At most the shorter string can match, so ratio() <= 2 * min(len) / total length
+    if 2 * min(len(a), len(b)) < threshold * (len(a) + len(b)):
+        return 0.0
+    if Indel is not None and Indel.normalized_similarity(a, b) < threshold:
+        return 0.0
+    matcher = _matcher_for(b)
+    matcher.set_seq1(a)
+    if matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+
+def _fetch_spdx_list(url: str) -> Dict:
+    """
+    Fetch an SPDX license list data file, persisting it on disk between runs.
+    
+    A persisted copy younger than SPDX_LIST_MAX_AGE_SECONDS is used as is; an older
+    one is revalidated with its ETag, so an unchanged list is not downloaded again.
+    
+    Args:
+        url: URL of the SPDX JSON data file
+        
+    Returns:
+        Parsed JSON document
+    """
+    cache_path = SPDX_LIST_CACHE_DIR / url.rsplit('/', 1)[-1]
+    etag_path = cache_path.with_name(cache_path.name + '.etag')
+    
+    headers = {}
+    try:
+        if time.time() - cache_path.stat().st_mtime < SPDX_LIST_MAX_AGE_SECONDS:
+            return load_json(cache_path.read_bytes())
+        headers['If-None-Match'] = etag_path.read_text().strip()
+    except (OSError, ValueError):
+        pass
+    
+    response = SESSION.get(url, headers=headers, timeout=10)
+    if response.status_code == 304:
+        # Unchanged upstream: restart the max age and reuse the persisted copy
+        try:
+            data = load_json(cache_path.read_bytes())
+            os.utime(cache_path)
+            return data
+        except (OSError, ValueError):
+            response = SESSION.get(url, timeout=10)
+    response.raise_for_status()
+    
+    try:
+        SPDX_LIST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so concurrent readers never see a partial list
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(response.content)
+        os.replace(temp_path, cache_path)
+        if response.headers.get('ETag'):
+            etag_path.write_text(response.headers['ETag'])
+        else:
+            etag_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not persist SPDX data from {url}: {e}")
+    
+    return load_json(response.content)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_license_name(license_name: str) -> str:
+    """
+    Normalize a license name for matching.
+    
+    The result depends only on the input string, so it is memoized: the SPDX
+    license names compared on every fuzzy lookup are normalized only once.
+    """
+    if not license_name:
+        return ""
+        
+    # Convert to lowercase and remove extra whitespace
+    normalized = NORMALIZE_WHITESPACE.sub(' ', license_name.strip().lower())
+    
+    # Remove common prefixes/suffixes
+    normalized = NORMALIZE_THE_PREFIX.sub('', normalized)
+    normalized = NORMALIZE_LICENSE_SUFFIX.sub(' license', normalized)
+    
+    # Normalize version patterns
+    normalized = NORMALIZE_V_PREFIX.sub(' v', normalized)
+    normalized = NORMALIZE_VERSION_WORD.sub(' v', normalized)
+    
+    # Remove punctuation that doesn't affect meaning
+    normalized = NORMALIZE_PUNCTUATION.sub('', normalized)
+    normalized = NORMALIZE_WHITESPACE.sub(' ', normalized).strip()
+    
+    return normalized
+
+
+# License names that dominate SBOMs, by normalized name, with the SPDX ID the exact
+# and pattern matching steps give them. They are answered without loading the SPDX list.
+COMMON_LICENSE_ALIASES = {_normalize_license_name(name): spdx_id for name, spdx_id in (
+    ('MIT', 'MIT'),
+    ('MIT License', 'MIT'),
+    ('The MIT License', 'MIT'),
+    ('Apache-2.0', 'Apache-2.0'),
+    ('Apache License 2.0', 'Apache-2.0'),
+    ('Apache License, Version 2.0', 'Apache-2.0'),
+    ('The Apache License, Version 2.0', 'Apache-2.0'),
+    ('The Apache Software License, Version 2.0', 'Apache-2.0'),
+    ('BSD-2-Clause', 'BSD-2-Clause'),
+    ('BSD-3-Clause', 'BSD-3-Clause'),
+    ('BSD 3-Clause License', 'BSD-3-Clause'),
+    ('ISC', 'ISC'),
+    ('0BSD', '0BSD'),
+    ('MPL-2.0', 'MPL-2.0'),
+    ('Mozilla Public License 2.0', 'MPL-2.0'),
+    ('EPL-1.0', 'EPL-1.0'),
+    ('EPL-2.0', 'EPL-2.0'),
+    ('Eclipse Public License 1.0', 'EPL-1.0'),
+    ('Eclipse Public License 2.0', 'EPL-2.0'),
+    ('Eclipse Public License v2.0', 'EPL-2.0'),
+    ('Eclipse Public License - v 2.0', 'EPL-2.0'),
+    ('LGPL-2.1-only', 'LGPL-2.1-only'),
+    ('GPL-2.0-only', 'GPL-2.0-only'),
+    ('GPL-3.0-only', 'GPL-3.0-only'),
+    ('Unlicense', 'Unlicense'),
+    ('CC0-1.0', 'CC0-1.0'),
+)}
+
+# Scheme, "www." and a trailing file extension or slash, stripped by _normalize_license_url()
+LICENSE_URL_NOISE = re.compile(r'^https?://(?:www\.)?|(?:\.(?:txt|html?|php))?/*$')
+
+
+def _normalize_license_url(url: str) -> str:
+    """Reduce a license URL to host and path, so variants of the same URL compare equal."""
+    return LICENSE_URL_NOISE.sub('', url.strip().lower())
+
+
+# Canonical license URLs that packages give as their license, by normalized URL,
+# with the SPDX ID the name patterns give the license
+LICENSE_URL_ALIASES = {_normalize_license_url(url): spdx_id for url, spdx_id in (
+    ('https://www.apache.org/licenses/LICENSE-2.0', 'Apache-2.0'),
+    ('https://opensource.org/licenses/Apache-2.0', 'Apache-2.0'),
+    ('https://opensource.org/licenses/MIT', 'MIT'),
+    ('https://opensource.org/licenses/mit-license.php', 'MIT'),
+    ('https://opensource.org/licenses/BSD-2-Clause', 'BSD-2-Clause'),
+    ('https://opensource.org/licenses/BSD-3-Clause', 'BSD-3-Clause'),
+    ('https://opensource.org/licenses/ISC', 'ISC'),
+    ('https://www.eclipse.org/legal/epl-v10.html', 'EPL-1.0'),
+    ('https://www.eclipse.org/legal/epl-2.0', 'EPL-2.0'),
+    ('https://www.eclipse.org/legal/epl-v20.html', 'EPL-2.0'),
+    ('https://www.mozilla.org/MPL/2.0', 'MPL-2.0'),
+    ('https://www.gnu.org/licenses/gpl-2.0.html', 'GPL-2.0-only'),
+    ('https://www.gnu.org/licenses/gpl-3.0.html', 'GPL-3.0-only'),
+    ('https://www.gnu.org/licenses/lgpl-2.1.html', 'LGPL-2.1-only'),
+    ('https://www.gnu.org/licenses/lgpl-3.0.html', 'LGPL-3.0-only'),
+    ('https://creativecommons.org/publicdomain/zero/1.0', 'CC0-1.0'),
+    ('https://creativecommons.org/publicdomain/zero/1.0/legalcode', 'CC0-1.0'),
+    ('https://unlicense.org', 'Unlicense'),
+)}
+
+# Placeholder license values that name no license; they can never match an SPDX ID
+LICENSE_SENTINELS = frozenset({'unknown', 'none', 'n/a', 'noassertion', 'proprietary', 'commercial'})
+
+
+class AIUnavailableError(Exception):
+    """Raised when the AI provider is rate limited or cannot be reached."""
+
 
 class LicenseResolver:
     """Resolves license names to SPDX identifiers using multiple strategies."""
@@ -37,6 +311,14 @@ class LicenseResolver:
         self.ai_provider = ai_provider
         self._spdx_licenses = None
         self._spdx_exceptions = None
+        self._spdx_lock = threading.Lock()
+        # Lookup structures derived from the loaded SPDX list, see _get_spdx_index()
+        self._spdx_index = None
+        # Resolution results by license name; callers treat them as read-only
+        self._resolutions: Dict[str, Dict[str, any]] = {}
+        # One lock per license name, so concurrent callers share a single AI resolution
+        self._ai_locks: Dict[str, threading.Lock] = {}
+        self._ai_locks_guard = threading.Lock()
         
     @lru_cache(maxsize=1)
     def _fetch_spdx_data(self) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
@@ -49,21 +331,11 @@ class LicenseResolver:
         logger.info("🔄 Fetching SPDX license data...")
         
         try:
-            # Fetch licenses
-            licenses_response = requests.get(
-                'https://raw.githubusercontent.com/spdx/license-list-data/main/json/licenses.json',
-                timeout=10
-            )
-            licenses_response.raise_for_status()
-            licenses_data = licenses_response.json()
-            
-            # Fetch exceptions
-            exceptions_response = requests.get(
-                'https://raw.githubusercontent.com/spdx/license-list-data/main/json/exceptions.json', 
-                timeout=10
-            )
-            exceptions_response.raise_for_status()
-            exceptions_data = exceptions_response.json()
+            # Fetch licenses and exceptions concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                licenses_data, exceptions_data = executor.map(
+                    _fetch_spdx_list, (SPDX_LICENSES_URL, SPDX_EXCEPTIONS_URL)
+                )
             
             # Create lookup dictionaries
             licenses_dict = {}
@@ -103,25 +375,34 @@ class LicenseResolver:
         Returns:
             Normalized license name
         """
-        if not license_name:
-            return ""
-            
-        # Convert to lowercase and remove extra whitespace
-        normalized = re.sub(r'\s+', ' ', license_name.strip().lower())
-        
-        # Remove common prefixes/suffixes
-        normalized = re.sub(r'^(the\s+)', '', normalized)
-        normalized = re.sub(r'\s+(license|licence)(\s*$)', ' license', normalized)
-        
-        # Normalize version patterns
-        normalized = re.sub(r'\s*v\.?\s*', ' v', normalized)
-        normalized = re.sub(r'\s*version\s+', ' v', normalized)
-        
-        # Remove punctuation that doesn't affect meaning
-        normalized = re.sub(r'[,\(\)]', '', normalized)
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        return _normalize_license_name(license_name)
+    
+    def _get_spdx_index(self) -> Tuple[Dict[str, str], List[int], List[Tuple[int, int, str, str]]]:
+        """
+        Return lookup structures for the loaded SPDX license list, built once per list.
         
-        return normalized
+        Returns:
+            Tuple of (dict mapping lowercased license IDs and normalized license names to
+            the first license ID they belong to, lengths of the fuzzy match targets in
+            ascending order, matching list of (length, SPDX list order, license ID, target)
+            where the targets are each license's normalized name and lowercased ID)
+        """
+        index = self._spdx_index
+        if index is None or index[0] is not self._spdx_licenses:
+            exact_matches = {}
+            targets = []
+            for position, (license_id, license_info) in enumerate(self._spdx_licenses.items()):
+                license_id_lower = license_id.lower()
+                normalized_name = self._normalize_license_name(license_info['name'])
+                exact_matches.setdefault(license_id_lower, license_id)
+                exact_matches.setdefault(normalized_name, license_id)
+                # A license's name is compared before its ID
+                targets.append((len(normalized_name), 2 * position, license_id, normalized_name))
+                targets.append((len(license_id_lower), 2 * position + 1, license_id, license_id_lower))
+            targets.sort()
+            index = (self._spdx_licenses, exact_matches, [target[0] for target in targets], targets)
+            self._spdx_index = index
+        return index[1], index[2], index[3]
     
     def _fuzzy_match_spdx(self, license_name: str, min_ratio: float = 0.8) -> Optional[str]:
         """
@@ -136,9 +417,18 @@ class LicenseResolver:
         """
         if not license_name:
             return None
+        
+        # Common names need neither the SPDX list nor any matching
+        alias = COMMON_LICENSE_ALIASES.get(self._normalize_license_name(license_name))
+        if alias is not None:
+            logger.debug("🎯 Common license: '%s' → '%s'", license_name, alias)
+            return alias
             
         if self._spdx_licenses is None:
-            self._spdx_licenses, self._spdx_exceptions = self._fetch_spdx_data()
+            # Concurrent resolutions must not fetch the SPDX list more than once
+            with self._spdx_lock:
+                if self._spdx_licenses is None:
+                    self._spdx_licenses, self._spdx_exceptions = self._fetch_spdx_data()
             
         if not self._spdx_licenses:
             return None
@@ -146,43 +436,35 @@ class LicenseResolver:
         normalized_input = self._normalize_license_name(license_name)
         best_match = None
         best_ratio = 0.0
+        exact_matches, target_lengths, targets = self._get_spdx_index()
         
-        # Check exact matches first
-        for license_id, license_info in self._spdx_licenses.items():
-            # Check against license ID
-            if normalized_input == license_id.lower():
-                return license_id
-                
-            # Check against normalized name
-            normalized_name = self._normalize_license_name(license_info['name'])
-            if normalized_input == normalized_name:
-                return license_id
+        # Check exact matches first (against license IDs and normalized names)
+        exact_match = exact_matches.get(normalized_input)
+        if exact_match is not None:
+            return exact_match
         
         # Special pattern matching for common cases
-        patterns = {
-            r'apache.*software.*license.*v?\.?2\.?0?': 'Apache-2.0',
-            r'apache.*license.*v?\.?2\.?0?': 'Apache-2.0',
-            r'bsd.*3.*clause': 'BSD-3-Clause',
-            r'bsd.*3': 'BSD-3-Clause',
-            r'mit.*license': 'MIT',
-            r'eclipse.*public.*license.*v?\.?2\.?0?': 'EPL-2.0',
-            r'eclipse.*public.*license.*v?\.?1\.?0?': 'EPL-1.0',
-            r'mozilla.*public.*license.*v?\.?2\.?0?': 'MPL-2.0',
-            r'gnu.*general.*public.*license.*v?\.?3': 'GPL-3.0-only',
-            r'gnu.*general.*public.*license.*v?\.?2': 'GPL-2.0-only',
-            r'lgpl.*v?\.?3': 'LGPL-3.0-only',
-            r'lgpl.*v?\.?2\.?1': 'LGPL-2.1-only'
-        }
-        
-        for pattern, spdx_id in patterns.items():
-            if re.search(pattern, normalized_input):
-                if spdx_id in self._spdx_licenses:
-                    logger.info(f"🎯 Pattern match: '{license_name}' → '{spdx_id}'")
-                    return spdx_id
-        
-        # Fuzzy matching
-        for license_id, license_info in self._spdx_licenses.items():
-            normalized_name = self._normalize_license_name(license_info['name'])
+        if SPDX_NAME_KEYWORDS.search(normalized_input):
+            for pattern, spdx_id in SPDX_NAME_PATTERNS:
+                if pattern.search(normalized_input):
+                    if spdx_id in self._spdx_licenses:
+                        logger.info(f"🎯 Pattern match: '{license_name}' → '{spdx_id}'")
+                        return spdx_id
+        
+        # Fuzzy matching. ratio() <= 2 * min(len) / total length, so only targets whose
+        # length lies within [n * r / (2 - r), n * (2 - r) / r] for an input of length n
+        # can reach min_ratio r; that range is cut out of the length-sorted targets.
+        input_length = len(normalized_input)
+        reachable_ratio = min_ratio - 1e-9
+        if 0 < reachable_ratio <= 1:
+            low = bisect_left(target_lengths, input_length * reachable_ratio / (2 - reachable_ratio))
+            high = bisect_right(target_lengths, input_length * (2 - reachable_ratio) / reachable_ratio)
+            reachable_targets = targets[low:high]
+        else:
+            reachable_targets = targets
+        
+        # Scored in SPDX list order, so equally good matches resolve to the same license as before
+        for _, _, license_id, target in sorted(reachable_targets, key=itemgetter(1)):
 
             # Length-ratio guard: when the candidate name is significantly shorter
             # than the input, require a higher similarity score to avoid false
@@ -190,10 +472,8 @@ class LicenseResolver:
             # longer inputs (e.g. "SL License" matching "SLF4J License").
             # We compute the fraction of the shorter string relative to the longer
             # one and boost the required ratio proportionally.
-            if normalized_name:
-                shorter_frac = min(len(normalized_input), len(normalized_name)) / max(
-                    len(normalized_input), len(normalized_name), 1
-                )
+            if target:
+                shorter_frac = min(input_length, len(target)) / max(input_length, len(target), 1)
                 # Boost required ratio: 0.5 * (1 - shorter_frac) added on top of
                 # min_ratio.  E.g. for shorter_frac=0.77 the required ratio becomes
                 # 0.8 + 0.5 * 0.23 ≈ 0.915, which rejects the SLF4J→SL false-positive
@@ -202,21 +482,11 @@ class LicenseResolver:
             else:
                 effective_min_ratio = min_ratio
 
-            # Compare against license name
-            ratio = SequenceMatcher(None, normalized_input, normalized_name).ratio()
+            # Compare against the license name or lowercased license ID
+            ratio = _bounded_ratio(normalized_input, target, max(best_ratio, effective_min_ratio))
             if ratio > best_ratio and ratio >= effective_min_ratio:
                 best_ratio = ratio
                 best_match = license_id
-
-            # Compare against license ID (lowercased)
-            ratio = SequenceMatcher(None, normalized_input, license_id.lower()).ratio()
-            id_shorter_frac = min(len(normalized_input), len(license_id)) / max(
-                len(normalized_input), len(license_id), 1
-            )
-            id_effective_min = min_ratio + max(0.0, (1.0 - id_shorter_frac) * 0.5)
-            if ratio > best_ratio and ratio >= id_effective_min:
-                best_ratio = ratio
-                best_match = license_id
         
         if best_match:
             logger.info(f"🎯 Fuzzy match: '{license_name}' → '{best_match}' (ratio: {best_ratio:.3f})")
@@ -253,21 +523,107 @@ Common examples:
 
 Response format: Just the SPDX ID or "UNKNOWN"."""
 
+        try:
+            return self._ai_complete(prompt)
+        except AIUnavailableError as e:
+            logger.error(f"❌ AI resolution failed: {e}")
+            return None
+    
+    def _ai_resolve_licenses(self, license_names: List[str]) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Use AI to resolve several license names to SPDX identifiers with one request.
+        
+        While the provider is rate limited or unreachable, the request is retried
+        with exponential backoff, up to AI_BATCH_ATTEMPTS times.
+        
+        Args:
+            license_names: Distinct, non-empty license names to resolve
+            
+        Returns:
+            Dictionary mapping each license name the response answered to its SPDX ID,
+            or None if the AI could not determine it; unanswered names are left out.
+            None if the request failed or the response could not be parsed.
+        """
+        if not self.api_key or not license_names:
+            return {}
+            
+        logger.info(f"🤖 Using AI to resolve {len(license_names)} licenses in one request")
+        
+        numbered_names = "\n".join(f'{number}. "{name}"' for number, name in enumerate(license_names, 1))
+        prompt = f"""You are an expert on open source licenses and SPDX identifiers. 
+
+Given these numbered license names:
+{numbered_names}
+
+Please provide the correct SPDX license identifier for each of them. Respond with one line per license name, "<number>. <SPDX ID>" (e.g., "1. EPL-2.0", "2. Apache-2.0", "3. MIT"), using "UNKNOWN" as the ID if you cannot determine it.
+
+Common examples:
+- "Eclipse Public License v2.0" → "EPL-2.0"
+- "Eclipse Public License - v 1.0" → "EPL-1.0"  
+- "Apache License, Version 2.0" → "Apache-2.0"
+- "MIT License" → "MIT"
+- "GNU General Public License v3.0" → "GPL-3.0-only"
+
+Response format: Just the numbered lines, nothing else."""
+
+        for attempt in range(1, AI_BATCH_ATTEMPTS + 1):
+            try:
+                content = self._ai_complete(prompt, max_tokens=20 * len(license_names))
+                break
+            except AIUnavailableError as e:
+                if attempt == AI_BATCH_ATTEMPTS:
+                    logger.error(f"❌ AI batch resolution failed after {attempt} attempts: {e}")
+                    return None
+                delay = AI_RETRY_DELAY_SECONDS * 2 ** (attempt - 1)
+                logger.warning(f"⚠️ AI provider unavailable ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+        
+        if not content:
+            return None
+        
+        answers = {}
+        for line in content.splitlines():
+            match = AI_BATCH_ANSWER.match(line)
+            if match and 1 <= int(match.group(1)) <= len(license_names):
+                spdx_id = match.group(2)
+                answers[license_names[int(match.group(1)) - 1]] = None if spdx_id == "UNKNOWN" else spdx_id
+        
+        if not answers:
+            logger.error("❌ AI batch response could not be parsed")
+            return None
+        return answers
+    
+    def _ai_complete(self, prompt: str, max_tokens: int = 50) -> Optional[str]:
+        """
+        Send a prompt to the configured AI provider.
+        
+        Args:
+            prompt: Prompt to send
+            max_tokens: Maximum number of tokens in the response
+            
+        Returns:
+            Response text, or None if there is none or it is "UNKNOWN"
+            
+        Raises:
+            AIUnavailableError: If the provider is rate limited or cannot be reached
+        """
         try:
             if self.ai_provider == 'github':
-                return self._github_models_resolve(prompt)
+                return self._github_models_resolve(prompt, max_tokens)
             elif self.ai_provider == 'openai':
-                return self._openai_resolve(prompt)
+                return self._openai_resolve(prompt, max_tokens)
             # Add other providers as needed
             else:
                 logger.warning(f"⚠️ Unsupported AI provider: {self.ai_provider}")
                 return None
                 
+        except AIUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"❌ AI resolution failed: {e}")
             return None
     
-    def _github_models_resolve(self, prompt: str) -> Optional[str]:
+    def _github_models_resolve(self, prompt: str, max_tokens: int = 50) -> Optional[str]:
         """Resolve using GitHub Models API."""
         try:
             headers = {
@@ -280,17 +636,19 @@ Response format: Just the SPDX ID or "UNKNOWN"."""
                     {'role': 'user', 'content': prompt}
                 ],
                 'model': 'gpt-4o-mini',
-                'max_tokens': 50,
+                'max_tokens': max_tokens,
                 'temperature': 0.1
             }
             
-            response = requests.post(
+            response = SESSION.post(
                 'https://models.inference.ai.azure.com/chat/completions',
                 headers=headers,
                 json=data,
                 timeout=30
             )
             
+            if response.status_code == 429:
+                raise AIUnavailableError("GitHub Models API rate limit exceeded")
             if response.status_code == 200:
                 result = response.json()
                 content = result['choices'][0]['message']['content'].strip()
@@ -302,12 +660,16 @@ Response format: Just the SPDX ID or "UNKNOWN"."""
             else:
                 logger.error(f"❌ GitHub Models API error: {response.status_code}")
                 
+        except requests.RequestException as e:
+            raise AIUnavailableError(f"GitHub Models API unreachable: {e}") from e
+        except AIUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"❌ GitHub Models resolution failed: {e}")
             
         return None
     
-    def _openai_resolve(self, prompt: str) -> Optional[str]:
+    def _openai_resolve(self, prompt: str, max_tokens: int = 50) -> Optional[str]:
         """Resolve using OpenAI API."""
         try:
             from openai import OpenAI
@@ -316,7 +678,7 @@ Response format: Just the SPDX ID or "UNKNOWN"."""
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
+                max_tokens=max_tokens,
                 temperature=0.1
             )
             
@@ -326,6 +688,8 @@ Response format: Just the SPDX ID or "UNKNOWN"."""
                 return content
                 
         except Exception as e:
+            if type(e).__name__ in OPENAI_UNAVAILABLE_ERRORS:
+                raise AIUnavailableError(f"OpenAI API unavailable: {e}") from e
             logger.error(f"❌ OpenAI resolution failed: {e}")
             
         return None
@@ -340,6 +704,25 @@ Response format: Just the SPDX ID or "UNKNOWN"."""
         Returns:
             Dictionary with resolution results
         """
+        result = self._resolve_locally(license_name)
+        if result is None:
+            result = self._resolve_with_ai(license_name)
+        return result
+    
+    def _resolve_locally(self, license_name: str) -> Optional[Dict[str, any]]:
+        """
+        Resolve a license name without network fallbacks.
+        
+        Handles empty names, license URLs, placeholder values, names resolved
+        by earlier calls and SPDX matching.
+        Successful SPDX matches are remembered for repeated license names.
+        
+        Args:
+            license_name: License name to resolve
+            
+        Returns:
+            Dictionary with resolution results, or None if the AI fallback is needed
+        """
         if not license_name or license_name.strip() == "":
             return {
                 'original': license_name,
@@ -348,35 +731,171 @@ Response format: Just the SPDX ID or "UNKNOWN"."""
                 'confidence': 0.0
             }
         
-        logger.debug(f"🔍 Resolving license: '{license_name}'")
+        # Well-known license URLs are answered from a table; other URLs and
+        # placeholders skip SPDX matching and the AI fallback
+        sentinel = license_name.strip().lower()
+        is_url = sentinel.startswith(('http://', 'https://'))
+        if is_url:
+            url_match = LICENSE_URL_ALIASES.get(_normalize_license_url(sentinel))
+            if url_match is not None:
+                return {
+                    'original': license_name,
+                    'resolved': url_match,
+                    'method': 'license_url',
+                    'confidence': 0.9
+                }
+        if is_url or sentinel in LICENSE_SENTINELS:
+            return {
+                'original': license_name,
+                'resolved': None,
+                'method': 'sentinel',
+                'confidence': 0.0
+            }
+        
+        # Repeated license names are answered from the results of earlier calls
+        cached = self._resolutions.get(license_name)
+        if cached is not None:
+            return cached
+        
+        logger.debug("🔍 Resolving license: '%s'", license_name)
         
         # Strategy 1: SPDX fuzzy matching
         spdx_match = self._fuzzy_match_spdx(license_name, min_ratio=0.8)
         if spdx_match:
-            return {
+            result = {
                 'original': license_name,
                 'resolved': spdx_match,
                 'method': 'spdx_fuzzy',
                 'confidence': 0.9
             }
+            self._resolutions[license_name] = result
+            return result
+        
+        return None
+    
+    def _ai_lock(self, license_name: str) -> threading.Lock:
+        """Return the lock that serializes AI resolution of a license name."""
+        with self._ai_locks_guard:
+            return self._ai_locks.setdefault(license_name, threading.Lock())
+    
+    def _record_ai_resolution(self, license_name: str, ai_match: Optional[str]) -> Dict[str, any]:
+        """
+        Build and remember the resolution result for an AI answer.
         
-        # Strategy 2: AI-powered resolution (fallback)
-        ai_match = self._ai_resolve_license(license_name)
+        Args:
+            license_name: Resolved license name
+            ai_match: SPDX ID given by the AI, or None
+            
+        Returns:
+            Dictionary with resolution results
+        """
         if ai_match:
-            return {
+            result = {
                 'original': license_name,
                 'resolved': ai_match,
                 'method': 'ai_assisted',
                 'confidence': 0.7
             }
+        else:
+            # No resolution found
+            result = {
+                'original': license_name,
+                'resolved': None,
+                'method': 'unresolved',
+                'confidence': 0.0
+            }
+        
+        self._resolutions[license_name] = result
+        return result
+    
+    def _resolve_with_ai(self, license_name: str) -> Dict[str, any]:
+        """
+        Resolve a license name that SPDX matching could not resolve.
+        
+        Args:
+            license_name: Non-empty license name to resolve
+            
+        Returns:
+            Dictionary with resolution results
+        """
+        with self._ai_lock(license_name):
+            # Another thread may have resolved the same name while this one waited
+            cached = self._resolutions.get(license_name)
+            if cached is not None:
+                return cached
+            
+            # Strategy 2: AI-powered resolution (fallback)
+            return self._record_ai_resolution(license_name, self._ai_resolve_license(license_name))
+    
+    def _resolve_batch_with_ai(self, license_names: List[str]) -> Dict[str, Dict[str, any]]:
+        """
+        Resolve license names that SPDX matching could not resolve with one AI request.
+        
+        Args:
+            license_names: Distinct, non-empty license names to resolve
+            
+        Returns:
+            Dictionary with the resolution results of the names that were answered;
+            if the request failed altogether, all names are recorded as unresolved
+        """
+        with ExitStack() as stack:
+            # Locks are always taken in sorted order, so concurrent batches cannot deadlock
+            for license_name in sorted(license_names):
+                stack.enter_context(self._ai_lock(license_name))
+            
+            results = {}
+            pending = []
+            for license_name in license_names:
+                cached = self._resolutions.get(license_name)
+                if cached is not None:
+                    results[license_name] = cached
+                else:
+                    pending.append(license_name)
+            
+            if not pending:
+                return results
+            
+            answers = self._ai_resolve_licenses(pending)
+            if answers is None:
+                # Resending a failed batch name by name would only multiply the failing requests
+                answers = dict.fromkeys(pending)
+            for license_name, ai_match in answers.items():
+                results[license_name] = self._record_ai_resolution(license_name, ai_match)
+            return results
+    
+    def resolve_licenses(self, license_names: List[str], max_workers: int = RESOLVE_WORKERS) -> Dict[str, Dict[str, any]]:
+        """
+        Resolve several license names at once.
+        
+        Each distinct name is resolved once. SPDX matching is CPU-bound and runs
+        first for all names; the names left for the network-bound AI fallback
+        are sent in batched requests. Names a batch response left out are
+        resolved concurrently one by one; a batch that failed altogether leaves
+        its names unresolved.
+        
+        Args:
+            license_names: License names to resolve (duplicates allowed)
+            max_workers: Maximum number of concurrent AI resolutions
+            
+        Returns:
+            Dictionary mapping each distinct license name to its resolution result
+        """
+        unique_names = list(dict.fromkeys(license_names))
+        results = {name: self._resolve_locally(name) for name in unique_names}
+        
+        needs_ai = [name for name, result in results.items() if result is None]
+        if len(needs_ai) > 1 and self.api_key:
+            for start in range(0, len(needs_ai), AI_BATCH_SIZE):
+                results.update(self._resolve_batch_with_ai(needs_ai[start:start + AI_BATCH_SIZE]))
+            needs_ai = [name for name in needs_ai if results[name] is None]
+        
+        if len(needs_ai) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(needs_ai))) as executor:
+                results.update(zip(needs_ai, executor.map(self._resolve_with_ai, needs_ai)))
+        else:
+            results.update((name, self._resolve_with_ai(name)) for name in needs_ai)
         
-        # No resolution found
-        return {
-            'original': license_name,
-            'resolved': None,
-            'method': 'unresolved',
-            'confidence': 0.0
-        }
+        return results
 
 
 def test_license_resolver():
@@ -397,11 +916,12 @@ def test_license_resolver():
     print("🧪 Testing License Resolver")
     print("=" * 50)
     
-    # Test without AI (SPDX matching only)
+    # Test without AI (SPDX matching only); all cases are resolved in one batch
     resolver = LicenseResolver()
+    results = resolver.resolve_licenses(test_cases)
     
     for test_case in test_cases:
-        result = resolver.resolve_license(test_case)
+        result = results[test_case]
         print(f"📝 '{test_case}'")
         print(f"   → {result['resolved']} ({result['method']}, confidence: {result['confidence']})")
         print()
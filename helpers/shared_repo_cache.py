@@ -6,11 +6,12 @@ import os
 import json
 import base64
 import logging
-import requests
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, Any
 
+from http_utils import make_session
+
 class SharedRepositoryCacheManager:
     """
     Cache manager using a dedicated repository for organization-wide cache sharing.
@@ -37,6 +38,12 @@ class SharedRepositoryCacheManager:
         # GitHub API endpoints
         self.api_base = f"https://api.github.com/repos/{cache_repo}/contents"
         
+        # One keep-alive session for all GitHub API calls, authenticated once
+        self.session = make_session(headers={
+            "Authorization": f"Bearer {github_token}",
+            "Accept": "application/vnd.github.v3+json"
+        })
+        
         logging.info(f"Shared repository cache manager initialized: {cache_repo}")
     
     def _get_cache_file_path(self, package_purl: str) -> str:
@@ -70,12 +77,7 @@ class SharedRepositoryCacheManager:
                         return cache_data.get('package_data')
             
             # Check shared repository cache
-            headers = {
-                "Authorization": f"Bearer {self.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            response = requests.get(f"{self.api_base}/{cache_path}", headers=headers)
+            response = self.session.get(f"{self.api_base}/{cache_path}")
             
             if response.status_code == 200:
                 file_data = response.json()
@@ -86,7 +88,7 @@ class SharedRepositoryCacheManager:
                 if datetime.now() - cached_time < self.cache_ttl:
                     # Cache to local for faster subsequent access
                     with open(local_cache_file, 'w') as f:
-                        json.dump(cache_data, f, indent=2)
+                        json.dump(cache_data, f, separators=(',', ':'))
                     
                     logging.debug(f"Shared repository cache hit for {package_purl}")
                     return cache_data.get('package_data')
@@ -119,7 +121,7 @@ class SharedRepositoryCacheManager:
             local_cache_file = self.local_cache_dir / f"{cache_path.replace('/', '_').replace('cache_', '')}"
             
             with open(local_cache_file, 'w') as f:
-                json.dump(cache_entry, f, indent=2)
+                json.dump(cache_entry, f, separators=(',', ':'))
             
             # Upload to shared repository (async/batch for performance)
             self._queue_for_shared_upload(cache_path, cache_entry)
@@ -134,16 +136,11 @@ class SharedRepositoryCacheManager:
         # In a production implementation, this would batch uploads for efficiency
         # For now, we'll upload immediately but this could be optimized
         try:
-            content = json.dumps(cache_entry, indent=2)
+            content = json.dumps(cache_entry, separators=(',', ':'))
             encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
             
-            headers = {
-                "Authorization": f"Bearer {self.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
             # Check if file exists to get SHA for update
-            existing_response = requests.get(f"{self.api_base}/{cache_path}", headers=headers)
+            existing_response = self.session.get(f"{self.api_base}/{cache_path}")
             
             data = {
                 "message": f"Cache update for {cache_entry['purl']}",
@@ -156,7 +153,7 @@ class SharedRepositoryCacheManager:
                 data["sha"] = existing_response.json()["sha"]
             
             # Upload/update file
-            response = requests.put(f"{self.api_base}/{cache_path}", headers=headers, json=data)
+            response = self.session.put(f"{self.api_base}/{cache_path}", json=data)
             
             if response.status_code in [200, 201]:
                 logging.debug(f"Successfully uploaded cache to shared repository: {cache_path}")
@@ -180,24 +177,19 @@ class SharedRepositoryCacheManager:
                 date_prefix = (datetime.now() - timedelta(days=days_back)).strftime("%Y/%m")
                 cache_dir_path = f"cache/{date_prefix}"
                 
-                headers = {
-                    "Authorization": f"Bearer {self.github_token}",
-                    "Accept": "application/vnd.github.v3+json"
-                }
-                
-                response = requests.get(f"{self.api_base}/{cache_dir_path}", headers=headers)
+                response = self.session.get(f"{self.api_base}/{cache_dir_path}")
                 
                 if response.status_code == 200:
                     files = response.json()
                     for file_info in files:
                         if file_info['name'].endswith('.json'):
                             # Download and cache locally
-                            file_response = requests.get(file_info['download_url'])
+                            file_response = self.session.get(file_info['download_url'])
                             if file_response.status_code == 200:
                                 cache_data = file_response.json()
                                 local_file = self.local_cache_dir / file_info['name']
                                 with open(local_file, 'w') as f:
-                                    json.dump(cache_data, f, indent=2)
+                                    json.dump(cache_data, f, separators=(',', ':'))
                                 synced += 1
             
             logging.info(f"Synced {synced} cache entries from shared repository")
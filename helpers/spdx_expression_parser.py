@@ -51,6 +51,9 @@ ADDITION_REF_PATTERN = re.compile(
     r'^(?:DocumentRef-([A-Za-z0-9.\-]+):)?AdditionRef-([A-Za-z0-9.\-]+)$'
 )
 
+# Expressions that mean no license was found
+NO_LICENSE_EXPRESSIONS = frozenset({'NO-LICENSE-FOUND', 'NOASSERTION', 'NONE'})
+
 
 class TokenType(Enum):
     """Token types for the SPDX expression lexer."""
@@ -119,6 +122,9 @@ class SPDXExpressionParser:
             except re.error as e:
                 self.logger.warning(f"Invalid regex in licensePatternAliases: {pattern_str!r} — {e}")
         
+        # Lookup tables for the most recently evaluated policy list (see _get_policy_index)
+        self._policy_index = None
+        
         self.logger.debug(f"Initialized SPDXExpressionParser with {len(self.license_aliases)} license aliases, "
                          f"{len(self.combined_aliases)} combined aliases, "
                          f"and {len(self._compiled_pattern_aliases)} pattern aliases")
@@ -361,7 +367,7 @@ class SPDXExpressionParser:
             Tuple of (policy_result, explanation)
             policy_result is one of: "allow", "deny", "needs-review"
         """
-        if not expression or expression in ['NO-LICENSE-FOUND', 'NOASSERTION', 'NONE']:
+        if not expression or expression in NO_LICENSE_EXPRESSIONS:
             return "needs-review", "No license found"
         
         expression = expression.strip()
@@ -546,6 +552,29 @@ class SPDXExpressionParser:
         # Unexpected token
         return "needs-review", f"Unexpected token: {token}", pos
     
+    def _get_policy_index(self, license_policies: List[Dict]) -> Tuple[Dict[str, Tuple[int, Optional[str]]],
+                                                                      Dict[str, Tuple[int, Optional[str]]]]:
+        """
+        Build lookup tables for a policy list, mapping policy IDs to (position, usagePolicy).
+        
+        The first table is keyed by the exact ID, the second by the lowercased ID.
+        Only the first policy per key is kept, so lookups return what a scan of
+        the list would. The tables are reused while the same list object is passed.
+        """
+        if self._policy_index is not None and self._policy_index[0] is license_policies:
+            return self._policy_index[1], self._policy_index[2]
+        
+        exact_index = {}
+        lower_index = {}
+        for position, policy in enumerate(license_policies):
+            policy_id = policy.get('id', '')
+            entry = (position, policy.get('usagePolicy'))
+            exact_index.setdefault(policy_id, entry)
+            lower_index.setdefault(policy_id.lower(), entry)
+        
+        self._policy_index = (license_policies, exact_index, lower_index)
+        return exact_index, lower_index
+    
     def _find_license_policy(self, license_id: str, license_policies: List[Dict], 
                             or_later: bool = False) -> Optional[str]:
         """
@@ -562,20 +591,17 @@ class SPDXExpressionParser:
         # Normalize through aliases
         normalized_id = self._normalize_license_id(original_id)
         
-        # Try exact match first
-        for policy in license_policies:
-            policy_id = policy.get('id', '')
-            if policy_id == normalized_id or policy_id == original_id:
-                return policy.get('usagePolicy')
+        exact_index, lower_index = self._get_policy_index(license_policies)
         
-        # Try case-insensitive match
-        normalized_lower = normalized_id.lower()
-        original_lower = original_id.lower()
+        # Try exact match first; the policy listed first wins, as with a list scan
+        matches = [m for m in (exact_index.get(normalized_id), exact_index.get(original_id)) if m]
+        if matches:
+            return min(matches)[1]
         
-        for policy in license_policies:
-            policy_id_lower = policy.get('id', '').lower()
-            if policy_id_lower == normalized_lower or policy_id_lower == original_lower:
-                return policy.get('usagePolicy')
+        # Try case-insensitive match
+        matches = [m for m in (lower_index.get(normalized_id.lower()), lower_index.get(original_id.lower())) if m]
+        if matches:
+            return min(matches)[1]
         
         # For "or later" licenses, also check variant forms
         if or_later:
@@ -588,9 +614,9 @@ class SPDXExpressionParser:
             ]
             
             for variant in variants:
-                for policy in license_policies:
-                    if policy.get('id', '').lower() == variant.lower():
-                        return policy.get('usagePolicy')
+                match = lower_index.get(variant.lower())
+                if match:
+                    return match[1]
         
         return None
     
@@ -618,10 +644,11 @@ class SPDXExpressionParser:
                 f"{base_normalized}-with-{exception_base}-exception",
             ])
         
+        _, lower_index = self._get_policy_index(license_policies)
         for combined in combined_forms:
-            for policy in license_policies:
-                if policy.get('id', '').lower() == combined.lower():
-                    return policy.get('usagePolicy')
+            match = lower_index.get(combined.lower())
+            if match:
+                return match[1]
         
         return None
     
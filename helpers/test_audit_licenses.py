@@ -15,6 +15,7 @@ from audit_licenses import (
     extract_components,
     get_purl,
     find_license_policy,
+    get_expression_parser,
     audit_component_with_resolution
 )
 from spdx_expression_parser import SPDXExpressionParser
@@ -63,6 +64,12 @@ class TestExtractComponents(unittest.TestCase):
         result = extract_components(sbom)
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]['name'], 'pkg')
+    
+    def test_license_strings_are_interned(self):
+        """Equal licenseConcluded values share one string object."""
+        sbom = json.loads('{"packages": [{"licenseConcluded": "MIT AND ISC"}, {"licenseConcluded": "MIT AND ISC"}]}')
+        result = extract_components(sbom)
+        self.assertIs(result[0]['licenseConcluded'], result[1]['licenseConcluded'])
 
 
 class TestGetPurl(unittest.TestCase):
@@ -160,6 +167,23 @@ class TestFindLicensePolicy(unittest.TestCase):
         self.assertEqual(result, 'allow')
 
 
+class TestGetExpressionParser(unittest.TestCase):
+    """Tests for get_expression_parser reuse."""
+    
+    def test_same_aliases_reuse_parser(self):
+        """Repeated calls with the same alias dicts return the same parser."""
+        aliases = {'mit license': 'MIT'}
+        first = get_expression_parser(aliases, None, None)
+        self.assertIs(get_expression_parser(aliases, None, None), first)
+    
+    def test_different_aliases_build_new_parser(self):
+        """A different alias dict produces a parser using those aliases."""
+        first = get_expression_parser({'mit license': 'MIT'}, None, None)
+        second = get_expression_parser({'apache license 2.0': 'Apache-2.0'}, None, None)
+        self.assertIsNot(first, second)
+        self.assertIn('apache license 2.0', second.license_aliases)
+
+
 class TestAuditComponentWithResolution(unittest.TestCase):
     """Tests for audit_component_with_resolution function."""
     
@@ -190,6 +214,25 @@ class TestAuditComponentWithResolution(unittest.TestCase):
         self.assertEqual(results[0]['policy'], 'allow')
         self.assertEqual(results[0]['license'], 'MIT')
     
+    def test_known_license_is_evaluated_once(self):
+        """A license with a policy is evaluated once, not again for the final check."""
+        component = {
+            'name': 'test-package',
+            'versionInfo': '1.0.0',
+            'licenseConcluded': 'MIT',
+            'externalRefs': [
+                {'referenceType': 'purl', 'referenceLocator': 'pkg:npm/test-package@1.0.0'}
+            ]
+        }
+        
+        with patch('audit_licenses.find_license_policy', return_value='allow') as mock_find:
+            results = audit_component_with_resolution(
+                component, self.policies, self.package_policies
+            )
+        
+        mock_find.assert_called_once()
+        self.assertEqual(results[0]['policy'], 'allow')
+    
     def test_denied_license(self):
         """Component with denied license."""
         component = {
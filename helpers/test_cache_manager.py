@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Otto GmbH & Co KG
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for cache_manager.py local cache behavior."""
+
+import unittest
+import tempfile
+import os
+import time
+import logging
+import json
+import threading
+import base64
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from cache_manager import SBOMCacheManager
+
+# Suppress logging during tests
+logging.disable(logging.CRITICAL)
+
+
+class TestSBOMCacheManager(unittest.TestCase):
+    """Tests for the local filesystem cache and its in-memory layer."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_patcher = patch.dict(os.environ, {'GITHUB_TOKEN': '', 'GITHUB_REPOSITORY_OWNER': ''})
+        self.env_patcher.start()
+        self.cache = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+    
+    def tearDown(self):
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def test_roundtrip(self):
+        """Cached data is returned for the same PURL."""
+        self.cache.cache_package_info('depsdev:npm:left-pad:1.3.0', {'license_data': ['MIT']})
+        result = self.cache.get_cached_package_info('depsdev:npm:left-pad:1.3.0')
+        self.assertEqual(result, {'license_data': ['MIT']})
+    
+    def test_miss_returns_none(self):
+        """Unknown PURLs are cache misses."""
+        self.assertIsNone(self.cache.get_cached_package_info('depsdev:npm:unknown'))
+    
+    def test_disk_entry_survives_new_instance(self):
+        """Entries written by one instance are read from disk by another."""
+        self.cache.cache_package_info('depsdev:npm:left-pad', {'license_data': ['MIT']})
+        other = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+        self.assertEqual(other.get_cached_package_info('depsdev:npm:left-pad'), {'license_data': ['MIT']})
+    
+    def test_miss_uses_directory_index(self):
+        """Misses are answered from the directory index without probing files."""
+        self.cache.get_cached_package_info('depsdev:npm:warm-up')
+        with patch('pathlib.Path.stat', side_effect=AssertionError("stat")):
+            self.assertIsNone(self.cache.get_cached_package_info('depsdev:npm:unknown'))
+    
+    def test_memory_layer_serves_repeated_lookups(self):
+        """Repeated lookups are answered from memory without reading the file."""
+        self.cache.cache_package_info('depsdev:npm:left-pad', {'license_data': ['MIT']})
+        with patch('pathlib.Path.read_bytes', side_effect=AssertionError("disk read")):
+            result = self.cache.get_cached_package_info('depsdev:npm:left-pad')
+        self.assertEqual(result, {'license_data': ['MIT']})
+    
+    def test_memory_layer_evicts_oldest(self):
+        """The in-memory layer is bounded by max_mem_entries."""
+        cache = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1, max_mem_entries=2)
+        for name in ('a', 'b', 'c'):
+            cache.cache_package_info(f'depsdev:npm:{name}', {'license_data': [name]})
+        self.assertEqual(len(cache._mem), 2)
+        self.assertEqual(cache.get_cached_package_info('depsdev:npm:a'), {'license_data': ['a']})
+    
+    def test_zero_ttl_disables_cache(self):
+        """A TTL of zero makes every lookup a miss."""
+        cache = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=0)
+        cache.cache_package_info('depsdev:npm:left-pad', {'license_data': ['MIT']})
+        self.assertIsNone(cache.get_cached_package_info('depsdev:npm:left-pad'))
+    
+    def test_old_mtime_expires_entry(self):
+        """Freshness is based on the cache file's mtime."""
+        self.cache.cache_package_info('depsdev:npm:left-pad', {'license_data': ['MIT']})
+        cache_file = self.cache._get_cache_file_path(self.cache._get_cache_key('depsdev:npm:left-pad'))
+        old = time.time() - 2 * 3600
+        os.utime(cache_file, (old, old))
+        other = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+        self.assertIsNone(other.get_cached_package_info('depsdev:npm:left-pad'))
+        self.assertEqual(other.get_cache_stats()['expired_entries'], 1)
+    
+    def test_unchanged_entry_only_refreshes_mtime(self):
+        """Re-caching identical data keeps the file content and restarts the TTL."""
+        self.cache.cache_package_info('depsdev:npm:same', {'license_data': ['MIT']})
+        cache_file = self.cache._get_cache_file_path(self.cache._get_cache_key('depsdev:npm:same'))
+        old = time.time() - 2 * 3600
+        os.utime(cache_file, (old, old))
+        content = cache_file.read_bytes()
+        
+        other = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+        self.assertIsNone(other.get_cached_package_info('depsdev:npm:same'))
+        other.cache_package_info('depsdev:npm:same', {'license_data': ['MIT']})
+        
+        self.assertEqual(cache_file.read_bytes(), content)
+        self.assertGreater(cache_file.stat().st_mtime, old)
+        self.assertEqual(SBOMCacheManager(cache_dir=self.temp_dir.name).get_cached_package_info('depsdev:npm:same'),
+                         {'license_data': ['MIT']})
+        
+        other.cache_package_info('depsdev:npm:same', {'license_data': ['ISC']})
+        self.assertNotEqual(cache_file.read_bytes(), content)
+    
+    def test_unchanged_entry_removed_by_cleanup_is_rewritten(self):
+        """An entry deleted between the unchanged check and the mtime refresh is written again."""
+        self.cache.cache_package_info('depsdev:npm:cleaned', {'license_data': ['MIT']})
+        cache_file = self.cache._get_cache_file_path(self.cache._get_cache_key('depsdev:npm:cleaned'))
+        cache_file.unlink()
+        
+        with patch.object(self.cache, '_is_unchanged', return_value=True):
+            self.cache.cache_package_info('depsdev:npm:cleaned', {'license_data': ['MIT']})
+        
+        self.assertEqual(json.loads(cache_file.read_bytes())['package_data'], {'license_data': ['MIT']})
+    
+    def test_mutated_cached_data_is_rewritten(self):
+        """Data returned by a lookup, mutated and cached again is written, not just refreshed."""
+        self.cache.get_cached_package_info('depsdev:npm:warm-up')
+        self.cache.cache_package_info('depsdev:npm:mutated', {'license_data': ['MIT']})
+        cache_file = self.cache._get_cache_file_path(self.cache._get_cache_key('depsdev:npm:mutated'))
+        
+        package_data = self.cache.get_cached_package_info('depsdev:npm:mutated')
+        package_data['license_data'] = ['ISC']
+        self.cache.cache_package_info('depsdev:npm:mutated', package_data)
+        
+        self.assertEqual(json.loads(cache_file.read_bytes())['package_data'], {'license_data': ['ISC']})
+    
+    def test_disk_hit_is_not_serialized(self):
+        """Lookups read from disk take no fingerprint; a later identical write still only refreshes."""
+        self.cache.cache_package_info('depsdev:npm:read', {'license_data': ['MIT']})
+        other = SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+        
+        with patch('cache_manager._fingerprint', side_effect=AssertionError("serialized")):
+            package_data = other.get_cached_package_info('depsdev:npm:read')
+        
+        with patch('pathlib.Path.write_text', side_effect=AssertionError("rewritten")):
+            other.cache_package_info('depsdev:npm:read', {'license_data': ['MIT']})
+        package_data['license_data'] = ['ISC']
+        other.cache_package_info('depsdev:npm:read', package_data)
+        cache_file = other._get_cache_file_path(other._get_cache_key('depsdev:npm:read'))
+        self.assertEqual(json.loads(cache_file.read_bytes())['package_data'], {'license_data': ['ISC']})
+    
+    def test_shared_reuses_instance_per_settings(self):
+        """shared() hands out one instance per cache directory and TTL."""
+        first = SBOMCacheManager.shared(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+        
+        self.assertIs(SBOMCacheManager.shared(cache_dir=self.temp_dir.name, cache_ttl_hours=1), first)
+        self.assertIsNot(SBOMCacheManager.shared(cache_dir=self.temp_dir.name, cache_ttl_hours=2), first)
+    
+    def test_cleanup_removes_only_expired_files(self):
+        """Cleanup deletes expired entries and leaves fresh entries and subdirectories alone."""
+        self.cache.cache_package_info('depsdev:npm:fresh', {'license_data': ['MIT']})
+        self.cache.cache_package_info('depsdev:npm:stale', {'license_data': ['ISC']})
+        stale_file = self.cache._get_cache_file_path(self.cache._get_cache_key('depsdev:npm:stale'))
+        old = time.time() - 2 * 3600
+        os.utime(stale_file, (old, old))
+        os.mkdir(os.path.join(self.temp_dir.name, 'spdx'))
+        
+        self.assertEqual(self.cache.cleanup_expired_cache(), 1)
+        self.assertFalse(stale_file.exists())
+        self.assertEqual(self.cache.get_cache_stats(), {'total_entries': 1, 'valid_entries': 1, 'expired_entries': 0})
+    
+    def test_cleanup_keeps_entries_rewritten_after_scan(self):
+        """An entry that was expired when scanned but rewritten before its unlink is kept."""
+        self.cache.cache_package_info('depsdev:npm:rewritten', {'license_data': ['MIT']})
+        cache_file = self.cache._get_cache_file_path(self.cache._get_cache_key('depsdev:npm:rewritten'))
+        entries = [(entry, time.time() - 2 * 3600) for entry, _ in self.cache._scan_cache_files()]
+        
+        with patch.object(self.cache, '_scan_cache_files', return_value=entries):
+            self.assertEqual(self.cache.cleanup_expired_cache(), 0)
+        self.assertTrue(cache_file.exists())
+
+
+
+class TestOrganizationalCacheUpload(unittest.TestCase):
+    """Tests for batched uploads to the organization cache repository."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_patcher = patch.dict(os.environ, {'GITHUB_REPOSITORY_OWNER': 'example-org'})
+        self.env_patcher.start()
+        self.load_patcher = patch.object(SBOMCacheManager, '_load_organizational_cache', return_value=0)
+        self.mock_load = self.load_patcher.start()
+        self.cache = SBOMCacheManager(cache_dir=self.temp_dir.name, github_token='token')
+    
+    def tearDown(self):
+        self.load_patcher.stop()
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def test_org_cache_loaded_lazily_once(self):
+        """The organizational cache is loaded on the first lookup, not on construction."""
+        self.mock_load.assert_not_called()
+        self.cache.get_cached_package_info('depsdev:npm:a')
+        self.cache.get_cached_package_info('depsdev:npm:b')
+        self.mock_load.assert_called_once()
+    
+    def test_org_cache_load_does_not_block_memory_hits(self):
+        """Memory cache hits are served while another thread loads the organizational cache."""
+        self.cache.cache_package_info('depsdev:npm:a', {'license_data': ['MIT']})
+        loading, release = threading.Event(), threading.Event()
+        
+        def slow_load():
+            loading.set()
+            release.wait(5)
+            return 0
+        
+        self.mock_load.side_effect = slow_load
+        loader = threading.Thread(target=self.cache.get_cached_package_info, args=('depsdev:npm:b',))
+        loader.start()
+        try:
+            self.assertTrue(loading.wait(5))
+            self.assertEqual(self.cache.get_cached_package_info('depsdev:npm:a'), {'license_data': ['MIT']})
+        finally:
+            release.set()
+            loader.join()
+        self.mock_load.assert_called_once()
+    
+    def test_org_cache_kill_switch(self):
+        """SBOM_DISABLE_ORG_CACHE disables the organizational cache."""
+        with patch.dict(os.environ, {'SBOM_DISABLE_ORG_CACHE': '1'}):
+            cache = SBOMCacheManager(cache_dir=self.temp_dir.name, github_token='token')
+        self.assertFalse(cache.org_cache_enabled)
+    
+    @patch('requests.Session')
+    def test_pending_entries_become_one_commit(self, mock_session_cls):
+        """All queued entries are written with a single tree and commit."""
+        session = mock_session_cls.return_value
+        responses = {
+            'ref': {'object': {'sha': 'head'}},
+            'commit': {'tree': {'sha': 'base-tree'}},
+        }
+        session.get.side_effect = lambda url, **kwargs: MagicMock(
+            json=MagicMock(return_value=responses['ref' if '/ref/' in url else 'commit']))
+        session.post.side_effect = lambda url, **kwargs: MagicMock(
+            json=MagicMock(return_value={'sha': 'new-tree' if url.endswith('/trees') else 'new-commit'}))
+        
+        self.cache.cache_package_info('depsdev:npm:a', {'license_data': ['MIT']})
+        self.cache.cache_package_info('depsdev:npm:b', {'license_data': ['ISC']})
+        session.post.assert_not_called()
+        
+        self.assertEqual(self.cache.flush_org_cache(), 2)
+        tree_call = session.post.call_args_list[0]
+        self.assertEqual(tree_call.kwargs['json']['base_tree'], 'base-tree')
+        self.assertEqual(len(tree_call.kwargs['json']['tree']), 2)
+        session.patch.assert_called_once()
+        self.assertEqual(session.patch.call_args.kwargs['json'], {'sha': 'new-commit'})
+        
+        # Nothing left to flush
+        self.assertEqual(self.cache.flush_org_cache(), 0)
+    
+    def _mock_git_api(self, session, patch_statuses):
+        """Answer the Git Data API calls of a flush; PATCH answers with the given status codes in turn."""
+        session.get.side_effect = lambda url, **kwargs: MagicMock(json=MagicMock(
+            return_value={'object': {'sha': 'head'}} if '/ref/' in url else {'tree': {'sha': 'base-tree'}}))
+        session.post.side_effect = lambda url, **kwargs: MagicMock(
+            json=MagicMock(return_value={'sha': 'new-tree' if url.endswith('/trees') else 'new-commit'}))
+        session.patch.side_effect = [MagicMock(status_code=status) for status in patch_statuses]
+    
+    @patch('requests.Session')
+    def test_non_fast_forward_update_is_retried(self, mock_session_cls):
+        """A rejected ref update re-reads main and commits the batch again."""
+        session = mock_session_cls.return_value
+        self._mock_git_api(session, [422, 200])
+        
+        self.cache.cache_package_info('depsdev:npm:a', {'license_data': ['MIT']})
+        
+        self.assertEqual(self.cache.flush_org_cache(), 1)
+        self.assertEqual(session.patch.call_count, 2)
+        self.assertEqual(sum('/ref/' in call.args[0] for call in session.get.call_args_list), 2)
+    
+    @patch('requests.Session')
+    def test_failed_flush_keeps_entries_queued(self, mock_session_cls):
+        """Entries of a batch that cannot be committed are retried by the next flush."""
+        session = mock_session_cls.return_value
+        self._mock_git_api(session, [500, 200])
+        failed_update = MagicMock(status_code=500)
+        failed_update.raise_for_status.side_effect = RuntimeError("server error")
+        session.patch.side_effect = [failed_update, MagicMock(status_code=200)]
+        
+        self.cache.cache_package_info('depsdev:npm:a', {'license_data': ['MIT']})
+        
+        self.assertEqual(self.cache.flush_org_cache(), 0)
+        self.assertEqual(self.cache.flush_org_cache(), 1)
+        self.assertEqual(self.cache.flush_org_cache(), 0)
+    
+    @patch('requests.Session')
+    def test_failed_flush_stops_batch_flushes(self, mock_session_cls):
+        """After a failed upload, new entries no longer trigger flushes until the final one."""
+        session = mock_session_cls.return_value
+        session.get.return_value.raise_for_status.side_effect = RuntimeError("403 Forbidden")
+        
+        with patch('cache_manager.ORG_UPLOAD_BATCH_SIZE', 1):
+            for name in ('a', 'b', 'c'):
+                self.cache.cache_package_info(f'depsdev:npm:{name}', {'license_data': [name]})
+        
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(len(self.cache._pending_uploads), 3)
+        
+        session.get.return_value.raise_for_status.side_effect = None
+        self.cache._flush_org_cache_at_exit()
+        self.assertEqual(len(session.post.call_args_list[0].kwargs['json']['tree']), 3)
+    
+    def test_full_batch_is_flushed_without_cache_lock(self):
+        """The batch flush triggered by a write runs after the cache lock is released."""
+        acquired = []
+        
+        def flush():
+            # Another worker must be able to take the lock while the batch is uploaded
+            def other_worker():
+                if self.cache._lock.acquire(timeout=1):
+                    acquired.append(True)
+                    self.cache._lock.release()
+            worker = threading.Thread(target=other_worker)
+            worker.start()
+            worker.join()
+            return 0
+        
+        with patch('cache_manager.ORG_UPLOAD_BATCH_SIZE', 1), \
+             patch.object(self.cache, 'flush_org_cache', side_effect=flush) as mock_flush:
+            self.cache.cache_package_info('depsdev:npm:a', {'license_data': ['MIT']})
+        
+        mock_flush.assert_called_once()
+        self.assertEqual(acquired, [True])
+    
+    @patch('requests.Session')
+    def test_http_session_is_shared(self, mock_session_cls):
+        """All organizational cache requests go through one session with the GitHub headers."""
+        session = self.cache._get_http_session()
+        
+        self.assertIs(self.cache._get_http_session(), session)
+        mock_session_cls.assert_called_once()
+        headers = session.headers.update.call_args.args[0]
+        self.assertEqual(headers['Authorization'], 'Bearer token')
+
+
+
+class TestOrganizationalCacheLoad(unittest.TestCase):
+    """Tests for loading entries from the organization cache repository."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_patcher = patch.dict(os.environ, {'GITHUB_REPOSITORY_OWNER': 'example-org'})
+        self.env_patcher.start()
+        self.cache = SBOMCacheManager(cache_dir=self.temp_dir.name, github_token='token')
+        self.session = MagicMock()
+        self.cache._http = self.session
+    
+    def tearDown(self):
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def _blob(self, cached_at):
+        entry = {'purl': 'pkg:npm/a', 'package_data': {'license_data': ['MIT']}, 'cached_at': cached_at}
+        return {'content': base64.b64encode(json.dumps(entry).encode()).decode()}
+    
+    def test_listing_is_one_query_and_blobs_are_fetched(self):
+        """Month directories are listed in one GraphQL query; expired entries are not written."""
+        fresh = datetime.now().isoformat()
+        expired = (datetime.now() - timedelta(days=30)).isoformat()
+        self.session.post.return_value.json.return_value = {'data': {'repository': {
+            'm0': {'entries': [
+                {'name': 'aaaa.json', 'oid': 'oid-a'},
+                {'name': 'bbbb.json', 'oid': 'oid-b'},
+                {'name': 'README.md', 'oid': 'oid-r'},
+            ]},
+        }}}
+        blobs = {'oid-a': self._blob(fresh), 'oid-b': self._blob(expired)}
+        self.session.get.side_effect = lambda url, **kwargs: MagicMock(
+            json=MagicMock(return_value=blobs[url.rsplit('/', 1)[1]]))
+        
+        self.assertEqual(self.cache._load_organizational_cache(), 1)
+        self.session.post.assert_called_once()
+        self.assertEqual(self.session.get.call_count, 2)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, 'aaaa.json')))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, 'bbbb.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
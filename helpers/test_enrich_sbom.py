@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Otto GmbH & Co KG
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for enrich_sbom.py package enrichment."""
+
+import unittest
+import tempfile
+import os
+import io
+import json
+import logging
+from contextlib import redirect_stdout, redirect_stderr
+from unittest.mock import patch, MagicMock
+
+import enrich_sbom
+from cache_manager import SBOMCacheManager
+from enrich_sbom import (
+    parse_purl,
+    prefetch_depsdev_versions,
+    get_maven_license_from_pom,
+    enrich_sbom_with_intelligent_resolution
+)
+
+# Suppress logging during tests
+logging.disable(logging.CRITICAL)
+
+
+def _response(status_code=200, payload=None):
+    """Build a mocked HTTP response with a JSON body."""
+    return MagicMock(status_code=status_code, content=json.dumps(payload or {}).encode())
+
+
+def _batch_entry(system, name, version, licenses):
+    """Build one versionbatch response entry, echoing its request like deps.dev does."""
+    return {
+        'request': {'versionKey': {'system': system, 'name': name, 'version': version}},
+        'version': {'licenses': licenses},
+    }
+
+
+def _package(name, purl=None):
+    """Build an SPDX SBOM package, with a purl reference if given."""
+    pkg = {'name': name, 'SPDXID': f'SPDXRef-{name}'}
+    if purl:
+        pkg['externalRefs'] = [{'referenceType': 'purl', 'referenceLocator': purl}]
+    return pkg
+
+
+class TestParsePurl(unittest.TestCase):
+    """Tests for splitting package URLs into deps.dev query parts."""
+    
+    def test_maven_uses_group_artifact_name(self):
+        """Maven namespaces and names are joined with ':' as deps.dev expects."""
+        self.assertEqual(parse_purl('pkg:maven/org.apache.commons/commons-lang3@3.12.0'),
+                         ('maven', 'org.apache.commons:commons-lang3', '3.12.0'))
+    
+    def test_maven_without_name_is_rejected(self):
+        """Maven purls need a namespace and a name."""
+        self.assertIsNone(parse_purl('pkg:maven/org.apache.commons'))
+    
+    def test_generic_ecosystems(self):
+        """Other ecosystems keep the name, with a namespace as a name/ prefix."""
+        self.assertEqual(parse_purl('pkg:npm/left-pad@1.3.0'), ('npm', 'left-pad', '1.3.0'))
+        self.assertEqual(parse_purl('pkg:pypi/requests@2.31.0'), ('pypi', 'requests', '2.31.0'))
+        self.assertEqual(parse_purl('pkg:cargo/serde@1.0.0'), ('cargo', 'serde', '1.0.0'))
+        self.assertEqual(parse_purl('pkg:nuget/Newtonsoft.Json@13.0.1'), ('nuget', 'Newtonsoft.Json', '13.0.1'))
+        self.assertEqual(parse_purl('pkg:npm/scope/name@2.0.0'), ('npm', 'scope/name', '2.0.0'))
+    
+    def test_version_is_optional(self):
+        """Purls without a version have None as version."""
+        self.assertEqual(parse_purl('pkg:npm/left-pad'), ('npm', 'left-pad', None))
+    
+    def test_invalid_purl(self):
+        """Strings without a path are not parsed."""
+        self.assertIsNone(parse_purl('left-pad'))
+
+
+class TestPrefetchDepsdevVersions(unittest.TestCase):
+    """Tests for the deps.dev versionbatch prefetch."""
+    
+    def setUp(self):
+        self.session_patcher = patch('enrich_sbom.SESSION')
+        self.mock_session = self.session_patcher.start()
+    
+    def tearDown(self):
+        self.session_patcher.stop()
+    
+    def test_results_are_matched_by_echoed_version_key(self):
+        """Responses are attached to the package they answer, whatever their order."""
+        self.mock_session.post.return_value = _response(payload={'responses': [
+            _batch_entry('PYPI', 'requests', '2.31.0', ['Apache-2.0']),
+            _batch_entry('NPM', 'left-pad', '1.3.0', ['WTFPL']),
+        ]})
+        
+        prefetched = prefetch_depsdev_versions([('npm', 'left-pad', '1.3.0'), ('pypi', 'requests', '2.31.0')])
+        
+        self.assertEqual(prefetched, {
+            ('npm', 'left-pad', '1.3.0'): {'licenses': ['WTFPL']},
+            ('pypi', 'requests', '2.31.0'): {'licenses': ['Apache-2.0']},
+        })
+    
+    def test_failed_page_keeps_only_answered_versions(self):
+        """A page failing mid-pagination leaves the unanswered versions to single requests."""
+        self.mock_session.post.side_effect = [
+            _response(payload={
+                'responses': [
+                    _batch_entry('NPM', 'b', '2.0.0', ['ISC']),
+                    {'request': {'versionKey': {'system': 'NPM', 'name': 'a', 'version': '1.0.0'}}},
+                ],
+                'nextPageToken': 'page-2',
+            }),
+            _response(status_code=500),
+        ]
+        
+        prefetched = prefetch_depsdev_versions([('npm', 'a', '1.0.0'), ('npm', 'b', '2.0.0'), ('npm', 'c', '3.0.0')])
+        
+        self.assertEqual(prefetched, {('npm', 'b', '2.0.0'): {'licenses': ['ISC']}})
+        self.assertEqual(self.mock_session.post.call_args.kwargs['json']['pageToken'], 'page-2')
+    
+    def test_failed_request_prefetches_nothing(self):
+        """A failing batch endpoint leaves every version to single requests."""
+        self.mock_session.post.side_effect = enrich_sbom.requests.ConnectionError("down")
+        
+        self.assertEqual(prefetch_depsdev_versions([('npm', 'a', '1.0.0')]), {})
+    
+    def test_unrequested_versions_are_ignored(self):
+        """Responses for versions that were not requested are dropped."""
+        self.mock_session.post.return_value = _response(payload={'responses': [
+            _batch_entry('NPM', 'other', '9.9.9', ['MIT']),
+        ]})
+        
+        self.assertEqual(prefetch_depsdev_versions([('npm', 'a', '1.0.0')]), {})
+
+
+
+POM_WITH_LICENSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <licenses><license><name>Eclipse Public License v2.0</name></license></licenses>
+</project>"""
+
+MAVEN_METADATA = b"<metadata><versioning><latest>2.0.0</latest></versioning></metadata>"
+
+
+class TestMavenPomFallback(unittest.TestCase):
+    """Tests for the Maven POM license lookup and its persisted results."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_patcher = patch.dict(os.environ, {'GITHUB_TOKEN': '', 'GITHUB_REPOSITORY_OWNER': ''})
+        self.env_patcher.start()
+        self.session_patcher = patch('enrich_sbom.SESSION')
+        self.mock_session = self.session_patcher.start()
+        self.mock_session.get.side_effect = lambda url, **kwargs: MagicMock(
+            status_code=200, content=MAVEN_METADATA if url.endswith('maven-metadata.xml') else POM_WITH_LICENSE)
+        self._clear_memo()
+    
+    def tearDown(self):
+        self._clear_memo()
+        self.session_patcher.stop()
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def _clear_memo(self):
+        enrich_sbom._get_maven_license_from_pom.cache_clear()
+        enrich_sbom._get_latest_maven_version.cache_clear()
+    
+    def _cache(self):
+        return SBOMCacheManager(cache_dir=self.temp_dir.name, cache_ttl_hours=1)
+    
+    def test_license_is_persisted_across_runs(self):
+        """A found license is cached, so a later run needs no Maven Central request."""
+        self.assertEqual(get_maven_license_from_pom('org.example:lib', '1.0.0', self._cache()),
+                         'Eclipse Public License v2.0')
+        self.assertEqual(self.mock_session.get.call_count, 1)
+        
+        self._clear_memo()
+        self.assertEqual(get_maven_license_from_pom('org.example:lib', '1.0.0', self._cache()),
+                         'Eclipse Public License v2.0')
+        self.assertEqual(self.mock_session.get.call_count, 1)
+    
+    def test_latest_version_is_not_persisted(self):
+        """Version-less lookups cache the POM license of the latest version, but not the version itself."""
+        cache = self._cache()
+        self.assertEqual(get_maven_license_from_pom('org.example:lib', None, cache), 'Eclipse Public License v2.0')
+        
+        self.assertIsNone(cache.get_cached_package_info('mavenmeta:org.example:lib'))
+        self.assertEqual(cache.get_cached_package_info('mavenpom:org.example:lib:2.0.0'),
+                         {'license': 'Eclipse Public License v2.0'})
+        
+        self._clear_memo()
+        self.mock_session.get.reset_mock()
+        self.assertEqual(get_maven_license_from_pom('org.example:lib', None, self._cache()),
+                         'Eclipse Public License v2.0')
+        self.assertEqual(self.mock_session.get.call_count, 1)
+    
+    def test_missing_license_is_not_persisted(self):
+        """Failed lookups are not cached, so the next run retries them."""
+        self.mock_session.get.side_effect = lambda url, **kwargs: MagicMock(status_code=404)
+        cache = self._cache()
+        
+        self.assertIsNone(get_maven_license_from_pom('org.example:lib', '1.0.0', cache))
+        self.assertIsNone(cache.get_cached_package_info('mavenpom:org.example:lib:1.0.0'))
+    
+    def test_transient_failure_is_not_memoized(self):
+        """A lookup that failed is retried within the same run instead of returning the memoized None."""
+        responses = [MagicMock(status_code=503), MagicMock(status_code=200, content=POM_WITH_LICENSE)]
+        self.mock_session.get.side_effect = lambda url, **kwargs: responses.pop(0)
+        
+        self.assertIsNone(get_maven_license_from_pom('org.example:lib', '1.0.0'))
+        self.assertEqual(get_maven_license_from_pom('org.example:lib', '1.0.0'), 'Eclipse Public License v2.0')
+        self.assertEqual(get_maven_license_from_pom('org.example:lib', '1.0.0'), 'Eclipse Public License v2.0')
+        self.assertFalse(responses)
+
+
+class TestEnrichSbom(unittest.TestCase):
+    """End-to-end tests for enriching an SBOM with mocked deps.dev responses."""
+    
+    LICENSES = {'a': ['MIT'], 'b': ['Apache-2.0'], 'c': ['MIT', 'Apache-2.0']}
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_patcher = patch.dict(os.environ, {'GITHUB_TOKEN': '', 'GITHUB_REPOSITORY_OWNER': ''})
+        self.env_patcher.start()
+        self.session_patcher = patch('enrich_sbom.SESSION')
+        self.mock_session = self.session_patcher.start()
+        # The batch endpoint is unavailable, so every package is fetched with a single request
+        self.mock_session.post.return_value = _response(status_code=503)
+        self.mock_session.get.side_effect = self._depsdev_get
+        
+        self.sbom_path = os.path.join(self.temp_dir.name, 'sbom.json')
+        with open(self.sbom_path, 'w') as f:
+            json.dump({'packages': [
+                _package('a', 'pkg:npm/a@1.0.0'),
+                _package('b', 'pkg:npm/b@1.0.0'),
+                _package('a-again', 'pkg:npm/a@1.0.0'),
+                _package('c', 'pkg:npm/c@1.0.0'),
+                _package('checkout', 'pkg:githubactions/github.com/actions/checkout@v4'),
+                _package('no-purl'),
+                _package('missing', 'pkg:npm/missing@1.0.0'),
+            ]}, f)
+    
+    def tearDown(self):
+        self.session_patcher.stop()
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def _depsdev_get(self, url, **kwargs):
+        """Answer deps.dev version requests from LICENSES; unknown packages are 404."""
+        name = url.split('/packages/')[1].split('/')[0]
+        if name not in self.LICENSES:
+            return _response(status_code=404)
+        return _response(payload={'licenses': self.LICENSES[name]})
+    
+    def _enrich(self, run_name):
+        """Enrich the test SBOM with a fresh cache and return the output SBOM and printed summary."""
+        cache = SBOMCacheManager(cache_dir=os.path.join(self.temp_dir.name, run_name), cache_ttl_hours=1)
+        output_path = os.path.join(self.temp_dir.name, f'{run_name}.json')
+        stdout = io.StringIO()
+        with patch.object(SBOMCacheManager, 'shared', return_value=cache), redirect_stdout(stdout), \
+             redirect_stderr(io.StringIO()):
+            enrich_sbom_with_intelligent_resolution(self.sbom_path, output_path, cache_ttl_hours=1)
+        with open(output_path, 'rb') as f:
+            return f.read(), stdout.getvalue()
+    
+    def test_duplicates_are_served_from_cache(self):
+        """Each distinct purl is fetched once; duplicates reuse the first package's result."""
+        output, _ = self._enrich('run')
+        
+        fetched = [call.args[0].split('/packages/')[1].split('/')[0] for call in self.mock_session.get.call_args_list]
+        self.assertEqual(sorted(fetched), ['a', 'b', 'c', 'missing'])
+        packages = {pkg['name']: pkg for pkg in json.loads(output)['packages']}
+        self.assertEqual(packages['a-again']['licenseConcluded'], 'MIT')
+        self.assertEqual(packages['c']['licenseConcluded'], 'MIT AND Apache-2.0')
+        self.assertNotIn('licenseConcluded', packages['missing'])
+    
+    def test_counters_are_aggregated(self):
+        """Outcomes of all workers and of the up-front skips add up in the summary."""
+        _, summary = self._enrich('run')
+        
+        self.assertIn("Enriched 4 packages. Skipped 3.", summary)
+        self.assertIn("Licenses resolved: 5", summary)
+        self.assertIn("Github Actions (1):", summary)
+        self.assertIn("No Purl (1):", summary)
+        self.assertIn("Not Found (1):", summary)
+    
+    def test_output_is_independent_of_worker_count(self):
+        """Enriching with a single worker gives the same SBOM as the thread pool."""
+        pooled, _ = self._enrich('pooled')
+        with patch('enrich_sbom.ENRICH_WORKERS', 1):
+            serial, _ = self._enrich('serial')
+        
+        self.assertEqual(pooled, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Otto GmbH & Co KG
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for github_packages_cache.py cache packaging."""
+
+import unittest
+import tempfile
+import os
+import logging
+from unittest.mock import patch, MagicMock
+
+import github_packages_cache
+from github_packages_cache import GitHubPackagesCacheManager, _tar_write_mode
+
+# Suppress logging during tests
+logging.disable(logging.CRITICAL)
+
+
+class TestCachePackageRoundTrip(unittest.TestCase):
+    """Tests for packing the cache on upload and unpacking it on download."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.manager = GitHubPackagesCacheManager('token', 'example-org')
+        self.manager.session = MagicMock()
+        self.manager.session.put.return_value = MagicMock(status_code=201)
+    
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+        self.temp_dir.cleanup()
+    
+    def _round_trip(self):
+        """Upload the local cache, wipe it and download the uploaded package again."""
+        entry = self.manager.local_cache_dir / 'aaaa.json'
+        entry.write_text('{"package_data":{"license_data":["MIT"]}}')
+        
+        self.assertTrue(self.manager._upload_cache_package('sbom-cache-test'))
+        package = self.manager.session.put.call_args.kwargs['data']
+        
+        entry.unlink()
+        self.manager.session.get.return_value = MagicMock(status_code=200, content=package)
+        self.assertTrue(self.manager._download_cache_package('sbom-cache-test'))
+        self.assertEqual(entry.read_text(), '{"package_data":{"license_data":["MIT"]}}')
+        return package
+    
+    def test_gzip_is_the_default(self):
+        """Without opting in, packages are gzip, which every Python version can read."""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('SBOM_CACHE_COMPRESSION', None)
+            self.assertEqual(_tar_write_mode(), 'w:gz')
+            package = self._round_trip()
+        self.assertEqual(package[:2], b'\x1f\x8b')
+    
+    @unittest.skipUnless(github_packages_cache.ZSTD_AVAILABLE, "zstd requires Python 3.14+")
+    def test_zstd_round_trip(self):
+        """SBOM_CACHE_COMPRESSION=zstd packs with zstd, and the download detects it."""
+        with patch.dict(os.environ, {'SBOM_CACHE_COMPRESSION': 'zstd'}):
+            self.assertEqual(_tar_write_mode(), 'w:zst')
+            package = self._round_trip()
+        self.assertEqual(package[:4], b'\x28\xb5\x2f\xfd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,19 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from license_resolver import LicenseResolver
+from license_resolver import (
+    LicenseResolver,
+    AIUnavailableError,
+    AI_BATCH_ATTEMPTS,
+    SPDX_LIST_MAX_AGE_SECONDS,
+    _fetch_spdx_list
+)
 from spdx_expression_parser import SPDXExpressionParser
 
 # Suppress logging during tests
@@ -97,6 +108,26 @@ class TestLicenseResolverFuzzyMatch(unittest.TestCase):
         result = self.resolver._fuzzy_match_spdx("BSD 3-Clause License")
         self.assertEqual(result, "BSD-3-Clause")
     
+    def test_pattern_precedence_follows_pattern_order(self):
+        """The first pattern in order wins, not the leftmost match in the name."""
+        result = self.resolver._fuzzy_match_spdx("MIT License or Apache License Version 2.0 dual")
+        self.assertEqual(result, "Apache-2.0")
+    
+    def test_pattern_skips_ids_missing_from_spdx_list(self):
+        """A matching pattern whose SPDX ID is not in the list falls through to later patterns."""
+        del self.resolver._spdx_licenses['GPL-3.0-only']
+        result = self.resolver._fuzzy_match_spdx("GNU General Public License v3 or v2 terms")
+        self.assertEqual(result, "GPL-2.0-only")
+    
+    def test_common_license_skips_spdx_list(self):
+        """Common license names are answered without loading the SPDX list."""
+        resolver = LicenseResolver()
+        with patch.object(resolver, '_fetch_spdx_data') as mock_fetch:
+            result = resolver._fuzzy_match_spdx("The Apache Software License, Version 2.0")
+        
+        mock_fetch.assert_not_called()
+        self.assertEqual(result, "Apache-2.0")
+    
     def test_no_match_returns_none(self):
         """Unknown license returns None."""
         result = self.resolver._fuzzy_match_spdx("Unknown Proprietary License XYZ")
@@ -121,6 +152,31 @@ class TestLicenseResolverResolve(unittest.TestCase):
         self.assertIsNone(result['resolved'])
         self.assertEqual(result['method'], 'empty')
     
+    def test_resolve_sentinel_skips_matching(self):
+        """Placeholder values and URLs are rejected without SPDX matching or AI."""
+        with patch.object(self.resolver, '_fuzzy_match_spdx') as mock_match, \
+             patch.object(self.resolver, '_ai_resolve_license') as mock_ai:
+            for license_name in (" Unknown ", "N/A", "Proprietary", "https://example.com/LICENSE.txt"):
+                result = self.resolver.resolve_license(license_name)
+                self.assertIsNone(result['resolved'])
+                self.assertEqual(result['method'], 'sentinel')
+        
+        mock_match.assert_not_called()
+        mock_ai.assert_not_called()
+    
+    def test_resolve_well_known_license_url(self):
+        """Canonical license URLs resolve from the URL table, whatever their scheme and suffix."""
+        with patch.object(self.resolver, '_ai_resolve_license') as mock_ai:
+            for license_name, spdx_id in (("https://www.apache.org/licenses/LICENSE-2.0", 'Apache-2.0'),
+                                          ("http://www.apache.org/licenses/LICENSE-2.0.txt", 'Apache-2.0'),
+                                          ("https://opensource.org/licenses/MIT", 'MIT'),
+                                          ("https://www.eclipse.org/legal/epl-2.0/", 'EPL-2.0')):
+                result = self.resolver.resolve_license(license_name)
+                self.assertEqual(result['resolved'], spdx_id)
+                self.assertEqual(result['method'], 'license_url')
+        
+        mock_ai.assert_not_called()
+    
     def test_resolve_known_license(self):
         """Known license resolves via SPDX fuzzy match."""
         result = self.resolver.resolve_license("MIT License")
@@ -138,6 +194,155 @@ class TestLicenseResolverResolve(unittest.TestCase):
         result = self.resolver.resolve_license("Weird Custom License 123")
         self.assertIsNone(result['resolved'])
         self.assertEqual(result['method'], 'unresolved')
+    
+    def test_repeated_name_is_resolved_once(self):
+        """A license name seen before is answered without running the strategies again."""
+        first = self.resolver.resolve_license("MIT License")
+        with patch.object(self.resolver, '_fuzzy_match_spdx') as mock_match:
+            second = self.resolver.resolve_license("MIT License")
+        
+        mock_match.assert_not_called()
+        self.assertEqual(second, first)
+    
+    def test_resolve_licenses_resolves_each_name_once(self):
+        """Batch resolution returns one result per distinct name."""
+        with patch.object(self.resolver, '_fuzzy_match_spdx', wraps=self.resolver._fuzzy_match_spdx) as mock_match:
+            results = self.resolver.resolve_licenses(["MIT License", "Apache License, Version 2.0", "MIT License"])
+        
+        self.assertEqual(mock_match.call_count, 2)
+        self.assertEqual(results["MIT License"]['resolved'], 'MIT')
+        self.assertEqual(results["Apache License, Version 2.0"]['resolved'], 'Apache-2.0')
+    
+    def test_resolve_licenses_sends_only_unmatched_names_to_ai(self):
+        """Names resolved by SPDX matching never reach the AI fallback."""
+        with patch.object(self.resolver, '_ai_resolve_license', return_value=None) as mock_ai:
+            results = self.resolver.resolve_licenses(["MIT License", "Weird Custom License 123", "Other Custom 456"])
+        
+        self.assertEqual(sorted(call.args[0] for call in mock_ai.call_args_list),
+                         ["Other Custom 456", "Weird Custom License 123"])
+        self.assertEqual(results["MIT License"]['method'], 'spdx_fuzzy')
+        self.assertEqual(results["Other Custom 456"]['method'], 'unresolved')
+    
+    def test_resolve_licenses_batches_ai_requests(self):
+        """With an API key, unmatched names share one AI request; unanswered names fall back to one by one."""
+        self.resolver.api_key = 'test-key'
+        names = ["Weird Custom License 123", "Other Custom 456", "Third Custom 789"]
+        
+        with patch.object(self.resolver, '_ai_complete', return_value='1. MIT\n2. UNKNOWN') as mock_complete, \
+             patch.object(self.resolver, '_ai_resolve_license', return_value='BSD-3-Clause') as mock_ai:
+            results = self.resolver.resolve_licenses(names)
+        
+        mock_complete.assert_called_once()
+        mock_ai.assert_called_once_with("Third Custom 789")
+        self.assertEqual(results["Weird Custom License 123"]['resolved'], 'MIT')
+        self.assertEqual(results["Weird Custom License 123"]['method'], 'ai_assisted')
+        self.assertEqual(results["Other Custom 456"]['method'], 'unresolved')
+        self.assertEqual(results["Third Custom 789"]['resolved'], 'BSD-3-Clause')
+    
+    def test_malformed_batch_response_is_not_resent_per_name(self):
+        """A batch response without any answer line leaves its names unresolved after one request."""
+        self.resolver.api_key = 'test-key'
+        names = ["Weird Custom License 123", "Other Custom 456"]
+        
+        with patch.object(self.resolver, '_ai_complete', return_value="Sorry, I cannot help.") as mock_complete, \
+             patch.object(self.resolver, '_ai_resolve_license') as mock_ai:
+            results = self.resolver.resolve_licenses(names)
+        
+        mock_complete.assert_called_once()
+        mock_ai.assert_not_called()
+        self.assertTrue(all(results[name]['method'] == 'unresolved' for name in names))
+    
+    def test_rate_limited_batch_backs_off_and_retries(self):
+        """A rate limited batch is retried after a growing delay instead of fanning out."""
+        self.resolver.api_key = 'test-key'
+        names = ["Weird Custom License 123", "Other Custom 456"]
+        responses = [AIUnavailableError("rate limited"), AIUnavailableError("rate limited"), "1. MIT\n2. ISC"]
+        
+        with patch.object(self.resolver, '_ai_complete', side_effect=responses) as mock_complete, \
+             patch.object(self.resolver, '_ai_resolve_license') as mock_ai, \
+             patch('license_resolver.time.sleep') as mock_sleep:
+            results = self.resolver.resolve_licenses(names)
+        
+        self.assertEqual(mock_complete.call_count, 3)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [2.0, 4.0])
+        mock_ai.assert_not_called()
+        self.assertEqual(results["Other Custom 456"]['resolved'], 'ISC')
+    
+    def test_unavailable_provider_leaves_batch_unresolved(self):
+        """Once all attempts fail, the batch's names are unresolved without per-name requests."""
+        self.resolver.api_key = 'test-key'
+        names = ["Weird Custom License 123", "Other Custom 456"]
+        
+        with patch.object(self.resolver, '_ai_complete', side_effect=AIUnavailableError("down")) as mock_complete, \
+             patch.object(self.resolver, '_ai_resolve_license') as mock_ai, \
+             patch('license_resolver.time.sleep'):
+            results = self.resolver.resolve_licenses(names)
+        
+        self.assertEqual(mock_complete.call_count, AI_BATCH_ATTEMPTS)
+        mock_ai.assert_not_called()
+        self.assertTrue(all(results[name]['method'] == 'unresolved' for name in names))
+    
+    def test_github_models_rate_limit_is_reported(self):
+        """A 429 from GitHub Models raises for batches and resolves nothing for single names."""
+        self.resolver.api_key = 'test-key'
+        with patch('license_resolver.SESSION') as mock_session:
+            mock_session.post.return_value = MagicMock(status_code=429)
+            with self.assertRaises(AIUnavailableError):
+                self.resolver._ai_complete("prompt")
+            self.assertIsNone(self.resolver._ai_resolve_license("Weird Custom License 123"))
+    
+    def test_concurrent_callers_share_one_ai_resolution(self):
+        """Threads resolving the same unknown name concurrently trigger a single AI call."""
+        def slow_ai(license_name):
+            time.sleep(0.05)
+            return 'MIT'
+        
+        with patch.object(self.resolver, '_ai_resolve_license', side_effect=slow_ai) as mock_ai:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(self.resolver.resolve_license, ["Custom MIT-ish"] * 4))
+        
+        mock_ai.assert_called_once_with("Custom MIT-ish")
+        self.assertTrue(all(result['resolved'] == 'MIT' for result in results))
+
+
+class TestSPDXListCache(unittest.TestCase):
+    """Tests for persisting the SPDX license list between runs."""
+    
+    URL = 'https://example.com/json/licenses.json'
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir_patcher = patch('license_resolver.SPDX_LIST_CACHE_DIR', Path(self.temp_dir.name))
+        self.dir_patcher.start()
+        self.session_patcher = patch('license_resolver.SESSION')
+        self.mock_session = self.session_patcher.start()
+        self.mock_session.get.return_value = MagicMock(
+            status_code=200, content=b'{"licenses": []}', headers={'ETag': '"v1"'}
+        )
+    
+    def tearDown(self):
+        self.session_patcher.stop()
+        self.dir_patcher.stop()
+        self.temp_dir.cleanup()
+    
+    def test_fresh_copy_is_used_without_request(self):
+        """A list fetched once is served from disk while it is younger than the max age."""
+        self.assertEqual(_fetch_spdx_list(self.URL), {'licenses': []})
+        self.assertEqual(_fetch_spdx_list(self.URL), {'licenses': []})
+        
+        self.assertEqual(self.mock_session.get.call_count, 1)
+    
+    def test_stale_copy_is_revalidated_with_etag(self):
+        """An expired copy is revalidated with its ETag and reused on 304."""
+        _fetch_spdx_list(self.URL)
+        cache_file = Path(self.temp_dir.name) / 'licenses.json'
+        old = time.time() - 2 * SPDX_LIST_MAX_AGE_SECONDS
+        os.utime(cache_file, (old, old))
+        self.mock_session.get.return_value = MagicMock(status_code=304)
+        
+        self.assertEqual(_fetch_spdx_list(self.URL), {'licenses': []})
+        self.assertEqual(self.mock_session.get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertGreater(cache_file.stat().st_mtime, old)
 
 
 class TestSPDXExpressionParserTokenize(unittest.TestCase):
@@ -261,6 +466,18 @@ class TestSPDXExpressionParserEvaluate(unittest.TestCase):
         """Empty expression needs review."""
         policy, _ = self.parser.parse_and_evaluate("", self.policies)
         self.assertEqual(policy, "needs-review")
+    
+    def test_first_listed_policy_wins(self):
+        """When an ID is listed twice, the first entry decides, as with a list scan."""
+        policies = [{'id': 'MIT', 'usagePolicy': 'deny'}] + self.policies
+        policy, _ = self.parser.parse_and_evaluate("MIT", policies)
+        self.assertEqual(policy, "deny")
+    
+    def test_policy_list_changes_are_picked_up(self):
+        """A different policy list is not answered from the previous list's index."""
+        self.parser.parse_and_evaluate("MIT", self.policies)
+        policy, _ = self.parser.parse_and_evaluate("MIT", [{'id': 'MIT', 'usagePolicy': 'deny'}])
+        self.assertEqual(policy, "deny")
 
 
 class TestSPDXExpressionParserAliases(unittest.TestCase):